@@ -49,6 +49,66 @@ def get_database_url():
 
 DATABASE_URL = get_database_url()
 
+# Versie-teller voor de tasks tabel: wordt opgehoogd bij elke wijziging
+# zodat caches (bijv. TaskEngine._get_tasks_lookup) weten wanneer ze verlopen zijn
+_tasks_version = 0
+
+
+def get_tasks_version() -> int:
+    """Geef de huidige versie van de tasks tabel (voor cache invalidatie)."""
+    return _tasks_version
+
+
+def bump_tasks_version():
+    """Markeer de tasks tabel als gewijzigd (invalideert task caches)."""
+    global _tasks_version
+    _tasks_version += 1
+
+
+# Idem voor de members tabel
+_members_version = 0
+
+
+def get_members_version() -> int:
+    """Geef de huidige versie van de members tabel (voor cache invalidatie)."""
+    return _members_version
+
+
+def bump_members_version():
+    """Markeer de members tabel als gewijzigd (invalideert member caches)."""
+    global _members_version
+    _members_version += 1
+
+
+# Idem voor de completions tabel
+_completions_version = 0
+
+
+def get_completions_version() -> int:
+    """Geef de huidige versie van de completions tabel (voor cache invalidatie)."""
+    return _completions_version
+
+
+def bump_completions_version():
+    """Markeer de completions tabel als gewijzigd (invalideert completion caches)."""
+    global _completions_version
+    _completions_version += 1
+
+
+# Idem voor de schedule_assignments tabel (rooster aangemaakt of verwijderd)
+_schedules_version = 0
+
+
+def get_schedules_version() -> int:
+    """Geef de huidige versie van de roosters (voor cache invalidatie)."""
+    return _schedules_version
+
+
+def bump_schedules_version():
+    """Markeer een rooster als aangemaakt of verwijderd (invalideert rooster caches)."""
+    global _schedules_version
+    _schedules_version += 1
+
 
 def get_db():
     """Maak een database connectie."""
@@ -222,6 +282,12 @@ def init_db():
         )
     """)
 
+    # Index voor het opzoeken van één completion (undo)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_completions_member_task
+        ON completions (member_id, task_id, completed_at)
+    """)
+
     conn.commit()
     cur.close()
     conn.close()
@@ -389,6 +455,8 @@ def seed_initial_data():
     conn.commit()
     cur.close()
     conn.close()
+    bump_tasks_version()
+    bump_members_version()
     print("Database gevuld met gezinsleden en taken!")
 
 
@@ -473,6 +541,10 @@ def reset_tasks_2026():
     conn.commit()
     cur.close()
     conn.close()
+    bump_tasks_version()
+    bump_completions_version()
+    # De task delete cascadet naar schedule_assignments
+    bump_schedules_version()
     print("Taken gereset naar 2026 configuratie!")
 
 
@@ -510,6 +582,7 @@ def update_task_targets():
     conn.commit()
     cur.close()
     conn.close()
+    bump_tasks_version()
     print("Taak-targets bijgewerkt!")
 
 
@@ -676,6 +749,7 @@ def add_completion(completion_data: dict) -> Completion:
     conn.commit()
     cur.close()
     conn.close()
+    bump_completions_version()
 
     # Maak return object (zonder completed_date veld dat niet in model zit)
     return_data = {k: v for k, v in completion_data.items() if k != "completed_date"}
@@ -722,6 +796,7 @@ def add_completions_bulk(completions_data: list[dict]) -> list[Completion]:
 
         # Commit alleen als ALLES is gelukt
         conn.commit()
+        bump_completions_version()
         return results
 
     except Exception as e:
@@ -753,6 +828,27 @@ def get_last_completion_for_task(member_id: str, task_id: str) -> Optional[Compl
     return None
 
 
+def get_last_completions_for_task(task_id: str, member_ids: list[str]) -> dict:
+    """Wanneer deden deze leden deze taak voor het laatst? (één query)
+
+    Returns:
+        dict van member_id -> laatste completed_at (leden zonder completion ontbreken)
+    """
+    if not member_ids:
+        return {}
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT member_id, MAX(completed_at) AS last_completed_at
+        FROM completions WHERE task_id = %s AND member_id = ANY(%s)
+        GROUP BY member_id
+    """, (int(task_id), [int(m) for m in member_ids]))
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+    return {str(row["member_id"]): row["last_completed_at"] for row in rows}
+
+
 def get_last_completion_for_member(member_id: str) -> Optional[Completion]:
     """Haal de laatst voltooide taak op voor een lid (voor undo)."""
     conn = get_db()
@@ -781,6 +877,8 @@ def delete_completion(completion_id: str) -> bool:
     conn.commit()
     cur.close()
     conn.close()
+    if deleted:
+        bump_completions_version()
     return deleted
 
 
@@ -802,6 +900,20 @@ def get_absence_for_date(member_id: str, check_date: date) -> Optional[Absence]:
     return None
 
 
+def get_absent_member_ids_for_date(check_date: date) -> set[str]:
+    """Geef de ids van alle leden die afwezig zijn op een datum (één query)."""
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT DISTINCT member_id FROM absences
+        WHERE start_date <= %s AND end_date >= %s
+    """, (check_date, check_date))
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+    return {str(r["member_id"]) for r in rows}
+
+
 def get_absences_for_week(week_start: date, week_end: date) -> list[Absence]:
     """Haal alle afwezigheden op die overlappen met een week (batch query)."""
     conn = get_db()
@@ -834,6 +946,45 @@ def get_completions_for_week(week_number: int) -> list[Completion]:
                        completed_at=r["completed_at"], week_number=r["week_number"]) for r in rows]
 
 
+def get_completion_counts_for_week(week_number: int) -> dict[tuple[str, str], int]:
+    """Tel voltooide taken per (member_id, task_id) voor een week (GROUP BY).
+
+    Goedkoper dan get_completions_for_week als alleen de aantallen nodig zijn:
+    er worden geen Completion objecten opgebouwd.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT member_id, task_id, COUNT(*) as count
+        FROM completions WHERE week_number = %s
+        GROUP BY member_id, task_id
+    """, (week_number,))
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+    return {(str(r["member_id"]), str(r["task_id"])): r["count"] for r in rows}
+
+
+def get_completion_summary_for_week(week_number: int) -> list[tuple[str, str, int]]:
+    """Tel voltooide taken per (member_id, task_name) voor een week (GROUP BY).
+
+    Gesorteerd op het eerste moment dat een taak gedaan werd, zodat de
+    volgorde gelijk is aan die van de losse completions.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT member_id, task_name, COUNT(*) as count
+        FROM completions WHERE week_number = %s
+        GROUP BY member_id, task_name
+        ORDER BY MIN(completed_at)
+    """, (week_number,))
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+    return [(str(r["member_id"]), r["task_name"], r["count"]) for r in rows]
+
+
 def add_absence(absence_data: dict) -> Absence:
     """Registreer afwezigheid."""
     conn = get_db()
@@ -1179,6 +1330,7 @@ def save_schedule_for_week(week_number: int, year: int, assignments: list[dict])
             ))
 
         conn.commit()
+        bump_schedules_version()
         return results
 
     except Exception as e:
@@ -1202,6 +1354,8 @@ def delete_schedule_for_week(week_number: int, year: int) -> int:
     conn.commit()
     cur.close()
     conn.close()
+    if deleted_count:
+        bump_schedules_version()
     return deleted_count
 
 
@@ -1221,6 +1375,77 @@ def update_assignment(assignment_id: str, member_id: str, member_name: str) -> b
     return updated
 
 
+def reassign_assignment(assignment_id: str, *, day_of_week: int, member_id: str, member_name: str) -> bool:
+    """Verplaats een assignment naar een andere dag en/of persoon (herplanning).
+
+    Eén UPDATE in plaats van delete + insert, zodat de taak nooit even
+    zonder assignment staat.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE schedule_assignments
+        SET day_of_week = %s, member_id = %s, member_name = %s
+        WHERE id = %s
+    """, (day_of_week, int(member_id), member_name, int(assignment_id)))
+    updated = cur.rowcount > 0
+    conn.commit()
+    cur.close()
+    conn.close()
+    return updated
+
+
+def apply_assignment_changes(changes: list[dict]) -> int:
+    """Voer meerdere assignment-wijzigingen uit in één transactie (bulk herplanning).
+
+    changes: lijst van dicts, in volgorde uitgevoerd, met key "action":
+        "update":   id, member_id, member_name
+        "reassign": id, day_of_week, member_id, member_name
+        "delete":   id
+
+    Returns het aantal gewijzigde rijen.
+    """
+    if not changes:
+        return 0
+
+    conn = get_db()
+    cur = conn.cursor()
+    changed = 0
+
+    try:
+        for change in changes:
+            action = change["action"]
+            if action == "delete":
+                cur.execute("DELETE FROM schedule_assignments WHERE id = %s", (int(change["id"]),))
+            elif action == "reassign":
+                cur.execute("""
+                    UPDATE schedule_assignments
+                    SET day_of_week = %s, member_id = %s, member_name = %s
+                    WHERE id = %s
+                """, (change["day_of_week"], int(change["member_id"]), change["member_name"],
+                      int(change["id"])))
+            elif action == "update":
+                cur.execute("""
+                    UPDATE schedule_assignments
+                    SET member_id = %s, member_name = %s
+                    WHERE id = %s
+                """, (int(change["member_id"]), change["member_name"], int(change["id"])))
+            else:
+                raise ValueError(f"Onbekende assignment-wijziging: {action}")
+            changed += cur.rowcount
+
+        conn.commit()
+        return changed
+
+    except Exception as e:
+        conn.rollback()
+        raise e
+
+    finally:
+        cur.close()
+        conn.close()
+
+
 def delete_assignment(assignment_id: str) -> bool:
     """Verwijder een specifieke assignment."""
     conn = get_db()
@@ -1518,6 +1743,68 @@ def get_week_schedule_data(week_number: int, year: int, week_start: date, week_e
     return result
 
 
+def get_undo_context(week_number: int, year: int, week_start: date, week_end: date,
+                     member_id: str, task_id: str, completed_date: date) -> dict:
+    """Haal alle data op voor undo_task_completion in één database connectie.
+
+    Retourneert een dict met: completion (de eerste die past, of None),
+    absences, schedule_exists, schedule
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    result = {}
+
+    # 1. De completion die ongedaan gemaakt wordt (geïndexeerd, niet de hele week)
+    cur.execute("""
+        SELECT id, task_id, member_id, member_name, task_name, completed_at, week_number
+        FROM completions
+        WHERE member_id = %s AND task_id = %s AND DATE(completed_at) = %s
+        ORDER BY id
+        LIMIT 1
+    """, (int(member_id), int(task_id), completed_date))
+    r = cur.fetchone()
+    result["completion"] = Completion(id=str(r["id"]), task_id=str(r["task_id"]), member_id=str(r["member_id"]),
+                                      member_name=r["member_name"], task_name=r["task_name"],
+                                      completed_at=r["completed_at"], week_number=r["week_number"]) if r else None
+
+    # 2. Absences for week
+    cur.execute("""
+        SELECT id, member_id, member_name, start_date, end_date, reason
+        FROM absences
+        WHERE start_date <= %s AND end_date >= %s
+    """, (week_end, week_start))
+    rows = cur.fetchall()
+    result["absences"] = [Absence(id=str(r["id"]), member_id=str(r["member_id"]), member_name=r["member_name"],
+                   start_date=r["start_date"], end_date=r["end_date"], reason=r["reason"]) for r in rows]
+
+    # 3. Schedule (bestaat als er assignments zijn)
+    cur.execute("""
+        SELECT id, week_number, year, day_of_week, task_id, task_name, member_id, member_name, created_at
+        FROM schedule_assignments
+        WHERE week_number = %s AND year = %s
+        ORDER BY day_of_week, task_name
+    """, (week_number, year))
+    rows = cur.fetchall()
+    result["schedule"] = [ScheduleAssignment(
+        id=str(r["id"]),
+        week_number=r["week_number"],
+        year=r["year"],
+        day_of_week=r["day_of_week"],
+        task_id=str(r["task_id"]),
+        task_name=r["task_name"],
+        member_id=str(r["member_id"]),
+        member_name=r["member_name"],
+        created_at=r["created_at"]
+    ) for r in rows]
+    result["schedule_exists"] = len(result["schedule"]) > 0
+
+    cur.close()
+    conn.close()
+
+    return result
+
+
 def migrate_add_schedule_table():
     """Migratie: voeg schedule_assignments tabel toe aan bestaande database."""
     conn = get_db()
@@ -1629,6 +1916,7 @@ def update_member_email(member_name: str, email: str) -> Member:
         """, (email, member_name))
         row = cur.fetchone()
         conn.commit()
+        bump_members_version()
 
         if not row:
             raise ValueError(f"Gezinslid '{member_name}' niet gevonden")
@@ -1096,8 +1096,7 @@ async def add_extra_task(request: ExtraTaskRequest):
         raise HTTPException(status_code=404, detail=f"Taak '{request.task_name}' niet gevonden")
 
     # Check of taak al gepland staat in het reguliere rooster
-    week_number = request.task_date.isocalendar()[1]
-    year = request.task_date.isocalendar()[0]
+    year, week_number, _ = request.task_date.isocalendar()
     day_of_week = request.task_date.weekday()
 
     conn = get_db()
@@ -1296,8 +1295,7 @@ async def rich_statistics():
     conn = get_db()
     cur = conn.cursor()
     today = today_local()
-    current_week = today.isocalendar()[1]
-    current_year = today.isocalendar()[0]
+    current_year, current_week, _ = today.isocalendar()
     last_week = current_week - 1 if current_week > 1 else 52
     last_week_year = current_year if current_week > 1 else current_year - 1
 
@@ -5822,8 +5820,7 @@ async def get_my_tasks_for_date(member_name: str, date: Optional[str] = None):
     else:
         target_date = today_local()
 
-    week_number = target_date.isocalendar()[1]
-    year = target_date.isocalendar()[0]
+    year, week_number, _ = target_date.isocalendar()
     day_of_week = target_date.weekday()
     day_names = ["maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag"]
     day_name = day_names[day_of_week]
@@ -1,8 +1,17 @@
 """Core logica voor eerlijke takenverdeling."""
+import calendar
+import heapq
 import random
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
 from datetime import date, datetime, timedelta
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from itertools import combinations
+from operator import itemgetter
+from types import MappingProxyType
 
 from .models import Member, Task, Completion, ScheduleAssignment, MissedTask
 from . import database as db
@@ -10,42 +19,215 @@ from .database import now_local, today_local, TIMEZONE
 
 # Tijdslot mapping voor taken (voor herplanning)
 # Taken in hetzelfde tijdslot zijn mutually exclusive per kind per dag
-TIME_SLOT_GROUPS = {
-    "avond": ["uitruimen_avond", "inruimen", "dekken", "koken"],
-    "middag": ["karton_papier", "glas"],
-    "ochtend": ["uitruimen_ochtend"]
-}
+TIME_SLOT_GROUPS = MappingProxyType({
+    "avond": ("uitruimen_avond", "inruimen", "dekken", "koken"),
+    "middag": ("karton_papier", "glas"),
+    "ochtend": ("uitruimen_ochtend",)
+})
+
+# Eén bit per tijdslot, zodat bezette slots per lid per dag in één int passen
+SLOT_BITS = MappingProxyType({slot: 1 << i for i, slot in enumerate(TIME_SLOT_GROUPS)})
+
+# Omgekeerde index: taaknaam -> tijdslot
+TASK_TO_SLOT = MappingProxyType(
+    {name: slot for slot, names in TIME_SLOT_GROUPS.items() for name in names}
+)
+assert len(TASK_TO_SLOT) == sum(len(names) for names in TIME_SLOT_GROUPS.values()), \
+    "Een taak mag maar in één tijdslot voorkomen"
 
 # Taken die alleen op doordeweekse dagen kunnen (voor school)
-WEEKDAY_ONLY_TASKS = {"uitruimen_ochtend", "uitruimen voor school"}
+WEEKDAY_ONLY_TASKS = frozenset({"uitruimen_ochtend", "uitruimen voor school"})
+
+# Dagen als 7-bit mask (bit 0 = maandag): ma-vr voor weekday-only taken, anders alle dagen
+WEEKDAY_ONLY_MASK = 0b0011111
+ALL_DAYS_MASK = 0b1111111
 
 # Minimale dagen tussen herhalingen van een taak (voor spreiding)
 # bijv. karton_papier: 2 betekent minstens 2 dagen ertussen
-TASK_MIN_SPACING = {
+TASK_MIN_SPACING = MappingProxyType({
     "karton_papier": 2,
     "karton/papier": 2,
     "glas": 5,
-}
+})
 
 # Maximum aantal taken per dag (harde limiet)
 MAX_TASKS_PER_DAY = 5
 
+# Maximaal aantal tussenstanden per taak bij het verdelen over de week
+# (beam search): houdt de verdeling begrensd, ook bij veel taken
+DISTRIBUTION_BEAM_WIDTH = 8
+
 # Taken die meerdere tijdslots blokkeren
 # Wie kookt doet geen dekken, inruimen of uitruimen (allemaal avond taken)
-TASK_BLOCKS_SLOTS = {
-    "koken": ["avond", "middag"],  # Blokkeert: dekken, inruimen, uitruimen_avond, karton, glas
-}
+TASK_BLOCKS_SLOTS = MappingProxyType({
+    "koken": ("avond", "middag"),  # Blokkeert: dekken, inruimen, uitruimen_avond, karton, glas
+})
+
+# Volgorde van taken binnen een dag
+TIME_SLOT_ORDER = {"ochtend": 0, "middag": 1, "avond": 2}
+
+# Bits voor tijdslots buiten TIME_SLOT_GROUPS (bijv. een nieuw time_of_day in
+# de database): elk onbekend slot krijgt bij eerste gebruik een eigen bit, zodat
+# alleen taken met hetzelfde slot elkaar blokkeren
+_extra_slot_bits = {}
+
+# TASK_BLOCKS_SLOTS als bitmask (zie SLOT_BITS): bezette slots per lid per dag
+# zijn één int, blokkeren is één OR en een vrij-check één AND
+TASK_BLOCKS_SLOT_MASK = MappingProxyType({
+    name: sum(SLOT_BITS[slot] for slot in slots)
+    for name, slots in TASK_BLOCKS_SLOTS.items()
+})
+
+# Hoe lang referentiedata (taken, gezinsleden) gecachet mag worden (seconden)
+REFERENCE_CACHE_TTL = 300
+
+# Hoe lang het weekoverzicht gecachet mag worden (seconden). Korter dan bij
+# referentiedata: completions uit een andere instance moeten snel zichtbaar zijn
+SUMMARY_CACHE_TTL = 30
 
 # Dag namen in het Nederlands
-DAY_NAMES = ["maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag"]
-DAY_EMOJIS = ["🌙", "🔥", "💧", "⚡", "🌸", "🌟", "☀️"]
+DAY_NAMES = ("maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag")
+DAY_EMOJIS = ("🌙", "🔥", "💧", "⚡", "🌸", "🌟", "☀️")
+
+# Vaste regels van het ASCII weekoverzicht (51 tekens breed)
+ASCII_SECTION = "╠═══════════════════════════════════════════════════╣"
+ASCII_DIVIDER = "║───────────────────────────────────────────────────║"
 
 # Maand namen in het Nederlands
-MONTH_NAMES = ["", "januari", "februari", "maart", "april", "mei", "juni",
-               "juli", "augustus", "september", "oktober", "november", "december"]
+MONTH_NAMES = ("", "januari", "februari", "maart", "april", "mei", "juni",
+               "juli", "augustus", "september", "oktober", "november", "december")
 
 
-@dataclass
+# "Vandaag" voor de lopende engine-actie (zie _pins_today). Een ContextVar in
+# plaats van een attribuut op de engine: die wordt gedeeld tussen requests.
+_request_today: ContextVar[Optional[date]] = ContextVar("_request_today", default=None)
+
+
+def _today() -> date:
+    """Geef vandaag; binnen een engine-actie steeds dezelfde datum."""
+    return _request_today.get() or today_local()
+
+
+def _pins_today(method):
+    """Decorator: bepaal vandaag één keer voor de hele actie.
+
+    Scheelt herhaalde timezone-conversies en voorkomt dat een bulk-actie rond
+    middernacht twee verschillende datums gebruikt. Geneste acties hergebruiken
+    de al vastgezette datum.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if _request_today.get() is not None:
+            return method(*args, **kwargs)
+        token = _request_today.set(today_local())
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _request_today.reset(token)
+    return wrapper
+
+
+@lru_cache(maxsize=256)
+def _week_start(year: int, week_number: int) -> date:
+    """Maandag van een ISO week (gememoized, wordt vaak herhaald aangeroepen)."""
+    return date.fromisocalendar(year, week_number, 1)
+
+
+@lru_cache(maxsize=256)
+def _make_bar_cached(value: int, max_value: int, width: int = 6) -> str:
+    """Visuele balk █░ (gememoized, er zijn maar weinig verschillende balken)."""
+    if max_value == 0:
+        return "░" * width
+    filled = min(int((value / max_value) * width), width)
+    return "█" * filled + "░" * (width - filled)
+
+
+@lru_cache(maxsize=8)
+def _spacing_masks(min_spacing: int) -> tuple:
+    """Per dag een 7-bit mask van de dagen die binnen min_spacing liggen."""
+    return tuple(
+        sum(1 << i for i in range(7) if abs(i - d) < min_spacing)
+        for d in range(7)
+    )
+
+
+@lru_cache(maxsize=256)
+def _day_subsets(allowed_mask: int, size: int, min_spacing: int) -> tuple:
+    """Alle combinaties van size dagen uit allowed_mask die de spacing respecteren.
+
+    Geeft (mask, dagen) paren in lexicografische volgorde, dus vroege dagen eerst.
+    """
+    neighborhood = _spacing_masks(min_spacing)
+    days = [d for d in range(7) if allowed_mask >> d & 1]
+    return tuple(
+        (sum(1 << d for d in combo), combo) for combo in combinations(days, size)
+        if not any(neighborhood[a] >> b & 1 for a, b in combinations(combo, 2))
+    )
+
+
+def task_slot(task: Task) -> str:
+    """Tijdslot van een taak: uit de database, anders via TASK_TO_SLOT."""
+    return task.time_of_day or TASK_TO_SLOT.get(task.name, "")
+
+
+def time_slot_bit(slot: str) -> int:
+    """Bit van een tijdslot (zie SLOT_BITS); onbekende slots krijgen een nieuwe bit."""
+    bit = SLOT_BITS.get(slot)
+    if bit is None:
+        bit = _extra_slot_bits.setdefault(slot, 1 << (len(SLOT_BITS) + len(_extra_slot_bits)))
+    return bit
+
+
+def task_slot_bit(task: Task) -> int:
+    """Tijdslot van een taak als bit (zie time_slot_bit)."""
+    return time_slot_bit(task_slot(task))
+
+
+def blocked_slot_mask(task: Task) -> int:
+    """Bitmask van de slots die een taak bezet; koken blokkeert er meerdere."""
+    return TASK_BLOCKS_SLOT_MASK.get(task.name) or task_slot_bit(task)
+
+
+def _time_order_key(task_info: dict) -> int:
+    """Sorteersleutel voor taken in een schedule-dag (ochtend, middag, avond)."""
+    return TIME_SLOT_ORDER.get(task_info.get("time_of_day", "avond"), 1)
+
+
+def _days_since(last_did: Optional[datetime], now: datetime) -> Optional[int]:
+    """Aantal dagen sinds last_did (None = nog nooit gedaan)."""
+    if not last_did:
+        return None
+    # Zorg dat beide timezone-aware zijn voor vergelijking
+    if last_did.tzinfo is None:
+        # Database gaf naive datetime, maak aware
+        last_did = last_did.replace(tzinfo=TIMEZONE)
+    return (now - last_did).days
+
+
+def _score_kernel(total_tasks: int, specific_tasks: int, days_ago: Optional[int],
+                  max_total: int, max_specific: int) -> float:
+    """Pure rekenkern van de gewogen score (alleen getallen, geen datetimes)."""
+    # Recency score: 0 = net gedaan, 1 = lang geleden of nooit
+    if days_ago is None:
+        recency_score = 1.0
+    else:
+        recency_score = min(days_ago / 7, 1.0)
+
+    return (
+        (total_tasks / max_total) * 0.5 +
+        (specific_tasks / max_specific) * 0.3 +
+        (1 - recency_score) * 0.2
+    )
+
+
+def _weighted_score(total_tasks: int, specific_tasks: int, last_did: Optional[datetime],
+                    max_total: int, max_specific: int, now: datetime) -> float:
+    """Gewogen score voor één lid (zie TaskEngine.calculate_weighted_score)."""
+    return _score_kernel(total_tasks, specific_tasks, _days_since(last_did, now),
+                         max_total, max_specific)
+
+
+@dataclass(slots=True)
 class MemberScore:
     """Score voor een gezinslid."""
     member: Member
@@ -56,7 +238,7 @@ class MemberScore:
     weighted_score: float
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskSuggestion:
     """Suggestie voor wie een taak moet doen."""
     suggested_member: Member
@@ -64,7 +246,7 @@ class TaskSuggestion:
     scores: list[MemberScore]
 
 
-@dataclass
+@dataclass(slots=True)
 class MemberComparison:
     """Vergelijkingsdata voor één gezinslid."""
     name: str
@@ -78,7 +260,7 @@ class MemberComparison:
     is_available: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskExplanation:
     """Uitgebreide uitleg waarom iemand een taak krijgt."""
     task_name: str
@@ -101,51 +283,261 @@ class TaskExplanation:
     raw_scores: dict  # {"Nora": 0.42, "Linde": 0.78, ...}
 
 
+@dataclass
+class AssignmentCache:
+    """De assignments van één week, één keer uit de database gelezen.
+
+    Herplanning leest hieruit in plaats van per completion opnieuw het hele
+    rooster op te halen. Elke wijziging gaat naar de database én naar deze
+    kopie, zodat volgende herplanningen in dezelfde week de actuele stand zien.
+
+    Met deferred=True worden de database-wijzigingen verzameld en pas bij
+    flush() in één transactie weggeschreven (voor bulk acties).
+    """
+    assignments: list[ScheduleAssignment]
+    pending: Optional[list[dict]] = None  # None = direct wegschrijven
+    # Aantal assignments per lid; lui opgebouwd, daarna per wijziging bijgewerkt
+    _counts: Optional[Counter] = field(default=None, repr=False)
+
+    @classmethod
+    def for_week(cls, week_number: int, year: int, deferred: bool = False) -> "AssignmentCache":
+        return cls(db.get_schedule_for_week(week_number, year), [] if deferred else None)
+
+    def for_day(self, day_of_week: int) -> list[ScheduleAssignment]:
+        return [a for a in self.assignments if a.day_of_week == day_of_week]
+
+    def member_counts(self) -> Counter:
+        """Aantal assignments per lid (naam) in deze week."""
+        if self._counts is None:
+            self._counts = Counter(a.member_name for a in self.assignments)
+        return self._counts
+
+    def _replace(self, assignment_id: str, **changes):
+        for idx, a in enumerate(self.assignments):
+            if a.id == assignment_id:
+                self.assignments[idx] = a.model_copy(update=changes)
+                if self._counts is not None:
+                    self._counts[a.member_name] -= 1
+                    self._counts[changes["member_name"]] += 1
+                return
+
+    def update(self, assignment_id: str, member_id: str, member_name: str):
+        """Zet een assignment op een andere persoon."""
+        if self.pending is None:
+            db.update_assignment(assignment_id, member_id, member_name)
+        else:
+            self.pending.append({"action": "update", "id": assignment_id,
+                                 "member_id": member_id, "member_name": member_name})
+        self._replace(assignment_id, member_id=member_id, member_name=member_name)
+
+    def reassign(self, assignment_id: str, day_of_week: int, member_id: str, member_name: str):
+        """Verplaats een assignment naar een andere dag en/of persoon."""
+        if self.pending is None:
+            db.reassign_assignment(assignment_id, day_of_week=day_of_week,
+                                   member_id=member_id, member_name=member_name)
+        else:
+            self.pending.append({"action": "reassign", "id": assignment_id, "day_of_week": day_of_week,
+                                 "member_id": member_id, "member_name": member_name})
+        self._replace(assignment_id, day_of_week=day_of_week,
+                      member_id=member_id, member_name=member_name)
+
+    def delete(self, assignment_id: str):
+        if self.pending is None:
+            db.delete_assignment(assignment_id)
+        else:
+            self.pending.append({"action": "delete", "id": assignment_id})
+        if self._counts is not None:
+            for a in self.assignments:
+                if a.id == assignment_id:
+                    self._counts[a.member_name] -= 1
+        self.assignments = [a for a in self.assignments if a.id != assignment_id]
+
+    def flush(self):
+        """Schrijf verzamelde wijzigingen in één transactie weg."""
+        if self.pending:
+            db.apply_assignment_changes(self.pending)
+            self.pending = []
+
+
 class TaskEngine:
     """Engine voor het beheren van huishoudelijke taken."""
 
+    def __init__(self):
+        # Caches voor bijna-statische referentiedata (taken en gezinsleden).
+        # Per soort: {"version", "expires", "items", ...afgeleide lookups}
+        self._reference_cache: dict = {}
+
+    def _cached_reference(self, kind, version: int, fetch, ttl: int = REFERENCE_CACHE_TTL) -> dict:
+        """Geef de cache entry voor referentiedata, ververst indien nodig.
+
+        De entry verloopt als de tabelversie verandert (wijziging in deze
+        instance) of na ttl seconden (wijziging in een andere serverless
+        instance).
+        """
+        entry = self._reference_cache.get(kind)
+        now = time.monotonic()
+        if entry is None or entry["version"] != version or entry["expires"] <= now:
+            entry = {
+                "version": version,
+                "expires": now + ttl,
+                "items": fetch(),
+            }
+            self._reference_cache[kind] = entry
+        return entry
+
+    def _tasks_cached(self) -> list[Task]:
+        """Geef alle taken (gecachet)."""
+        return self._cached_reference("tasks", db.get_tasks_version(), db.get_all_tasks)["items"]
+
+    def _members_cached(self) -> list[Member]:
+        """Geef alle gezinsleden (gecachet)."""
+        return self._cached_reference("members", db.get_members_version(), db.get_all_members)["items"]
+
+    def _get_tasks_lookup(self) -> dict:
+        """Geef een (gecachte) lookup van task display_name -> Task.
+
+        Taken veranderen vrijwel nooit, dus we bouwen de lookup één keer en
+        halen hem pas opnieuw op als de tasks tabel gewijzigd is.
+        """
+        entry = self._cached_reference("tasks", db.get_tasks_version(), db.get_all_tasks)
+        if "by_display_name" not in entry:
+            entry["by_display_name"] = {t.display_name: t for t in entry["items"]}
+        return entry["by_display_name"]
+
+    def _find_task(self, name: str) -> Optional[Task]:
+        """Zoek een taak op naam of display_name via de cache.
+
+        Exacte matches (hoofdletterongevoelig) komen uit de cache; voor de
+        fuzzy LIKE-match valt dit terug op db.get_task_by_name.
+        """
+        entry = self._cached_reference("tasks", db.get_tasks_version(), db.get_all_tasks)
+        if "by_key" not in entry:
+            by_key = {}
+            for t in entry["items"]:
+                by_key.setdefault(t.name.lower(), t)
+                by_key.setdefault(t.display_name.lower(), t)
+            entry["by_key"] = by_key
+
+        name_lower = name.lower().strip()
+        # Speciale case: "uitruimen" zonder "ochtend"/"avond" → default naar avond
+        if name_lower in ("uitruimen", "uitgeruimd"):
+            name_lower = "uitruimen_avond"
+
+        task = entry["by_key"].get(name_lower)
+        if task:
+            return task
+        return db.get_task_by_name(name)
+
+    def _find_member(self, name: str) -> Optional[Member]:
+        """Zoek een gezinslid op naam (hoofdletterongevoelig) via de cache."""
+        entry = self._cached_reference("members", db.get_members_version(), db.get_all_members)
+        if "by_name" not in entry:
+            entry["by_name"] = {m.name.lower(): m for m in entry["items"]}
+
+        member = entry["by_name"].get(name.lower())
+        if member:
+            return member
+        return db.get_member_by_name(name)
+
+    def _schedule_exists(self, week_number: int, year: int) -> bool:
+        """Check of er een rooster is voor een week (gecachet zolang het bestaat).
+
+        Alleen "bestaat" wordt gecachet: een rooster dat net in een andere
+        serverless instance is aangemaakt willen we niet mislopen.
+        """
+        key = ("schedule_exists", week_number, year)
+        entry = self._cached_reference(key, db.get_schedules_version(),
+                                       lambda: db.schedule_exists_for_week(week_number, year),
+                                       ttl=SUMMARY_CACHE_TTL)
+        if not entry["items"]:
+            del self._reference_cache[key]
+        return entry["items"]
+
     def get_current_week(self) -> int:
         """Geef het huidige ISO weeknummer."""
-        return today_local().isocalendar()[1]
+        return _today().isocalendar()[1]
+
+    def get_week_start(self, week_number: Optional[int] = None, year: Optional[int] = None) -> date:
+        """Geef de startdatum (maandag) van een week.
 
-    def get_week_start(self, week_number: Optional[int] = None) -> date:
-        """Geef de startdatum (maandag) van een week."""
+        Args:
+            week_number: ISO weeknummer (default: huidige week)
+            year: ISO jaar (default: huidig jaar)
+        """
         if week_number is None:
             week_number = self.get_current_week()
-        year = today_local().year
-        return date.fromisocalendar(year, week_number, 1)
+        if year is None:
+            year = _today().year
+        return _week_start(year, week_number)
+
+    def _absent_member_ids(self, check_date: date) -> set:
+        """Geef de ids van alle leden die afwezig zijn op een datum (één query)."""
+        return db.get_absent_member_ids_for_date(check_date)
 
     def is_member_available(self, member: Member, check_date: Optional[date] = None) -> bool:
         """Check of een gezinslid beschikbaar is (niet afwezig)."""
         if check_date is None:
-            check_date = today_local()
-        absence = db.get_absence_for_date(member.id, check_date)
-        return absence is None
+            check_date = _today()
+        return member.id not in self._absent_member_ids(check_date)
 
     def get_available_members(self, check_date: Optional[date] = None) -> list[Member]:
         """Geef alle beschikbare gezinsleden."""
-        all_members = db.get_all_members()
-        return [m for m in all_members if self.is_member_available(m, check_date)]
+        if check_date is None:
+            check_date = _today()
+        # Eén afwezigheden-query voor iedereen in plaats van één per lid
+        absent_ids = self._absent_member_ids(check_date)
+        return [m for m in self._members_cached() if m.id not in absent_ids]
 
     def get_task_count_this_week(self, member: Member, task: Optional[Task] = None) -> int:
         """Tel hoeveel taken een lid deze week heeft gedaan."""
         week_number = self.get_current_week()
-        completions = db.get_completions_for_member(member.id, week_number)
+        counts = db.get_completion_counts_for_week(week_number)
 
         if task:
-            return len([c for c in completions if c.task_id == task.id])
-        return len(completions)
+            return counts.get((member.id, task.id), 0)
+        return sum(count for (member_id, _), count in counts.items() if member_id == member.id)
 
     def get_last_completion(self, member: Member, task: Task) -> Optional[datetime]:
         """Wanneer deed dit lid deze taak voor het laatst?"""
         completion = db.get_last_completion_for_task(member.id, task.id)
         return completion.completed_at if completion else None
 
+    def _collect_week_stats(self, members: list[Member], task: Task,
+                            week_number: Optional[int] = None) -> dict:
+        """Verzamel de score-data voor een taak in één keer.
+
+        Eén GROUP BY query voor de hele week in plaats van een query per lid
+        per vergelijking (voorkomt O(N²) database calls).
+
+        Returns:
+            dict met "totals" (member_id -> taken deze week), "specifics"
+            (member_id -> keer deze taak deze week) en "last_did"
+            (member_id -> laatste keer deze taak gedaan, of None)
+        """
+        if week_number is None:
+            week_number = self.get_current_week()
+
+        totals = {m.id: 0 for m in members}
+        specifics = {m.id: 0 for m in members}
+        for (member_id, task_id), count in db.get_completion_counts_for_week(week_number).items():
+            if member_id in totals:
+                totals[member_id] += count
+                if task_id == task.id:
+                    specifics[member_id] += count
+
+        # Laatste keer kan ook in een eerdere week zijn, dus apart ophalen
+        # (één query voor alle leden)
+        last = db.get_last_completions_for_task(task.id, [m.id for m in members])
+        last_did = {m.id: last.get(m.id) for m in members}
+
+        return {"totals": totals, "specifics": specifics, "last_did": last_did}
+
     def calculate_weighted_score(
         self,
         member: Member,
         task: Task,
-        available_members: list[Member]
+        available_members: list[Member],
+        stats: Optional[dict] = None
     ) -> float:
         """
         Bereken een gewogen score voor wie de taak moet doen.
@@ -155,38 +547,53 @@ class TaskEngine:
         - 50%: Totaal aantal taken deze week
         - 30%: Aantal keer deze specifieke taak gedaan
         - 20%: Hoe lang geleden deze taak gedaan (recency)
+
+        Args:
+            stats: Optioneel - vooraf verzamelde data van _collect_week_stats
+                   (scheelt database calls als je meerdere leden scoort)
         """
-        total_tasks = self.get_task_count_this_week(member)
-        specific_tasks = self.get_task_count_this_week(member, task)
-        last_did = self.get_last_completion(member, task)
+        if stats is None:
+            stats = self._collect_week_stats(available_members, task)
+        totals = stats["totals"]
+        specifics = stats["specifics"]
+
+        total_tasks = totals.get(member.id, 0)
+        specific_tasks = specifics.get(member.id, 0)
+        last_did = stats["last_did"].get(member.id)
 
         # Normaliseer scores relatief aan andere beschikbare leden
-        max_total = max(self.get_task_count_this_week(m) for m in available_members) or 1
-        max_specific = max(self.get_task_count_this_week(m, task) for m in available_members) or 1
-
-        # Recency score: 0 = net gedaan, 1 = lang geleden of nooit
-        if last_did:
-            # Zorg dat beide timezone-aware zijn voor vergelijking
-            now = now_local()
-            if last_did.tzinfo is None:
-                # Database gaf naive datetime, maak aware
-                last_did = last_did.replace(tzinfo=TIMEZONE)
-            days_ago = (now - last_did).days
-            recency_score = min(days_ago / 7, 1.0)
-        else:
-            recency_score = 1.0
+        max_total = max(totals.get(m.id, 0) for m in available_members) or 1
+        max_specific = max(specifics.get(m.id, 0) for m in available_members) or 1
 
-        weighted = (
-            (total_tasks / max_total) * 0.5 +
-            (specific_tasks / max_specific) * 0.3 +
-            (1 - recency_score) * 0.2
-        )
+        return _weighted_score(total_tasks, specific_tasks, last_did,
+                               max_total, max_specific, now_local())
+
+    def _score_members(self, members: list[Member], task: Task, stats: dict) -> dict:
+        """Bereken de gewogen score voor alle leden in één doorloop.
 
-        return weighted
+        Maxima en "nu" worden één keer bepaald in plaats van per lid.
 
+        Returns:
+            dict van member_id -> score (lager = meer aan de beurt)
+        """
+        totals = stats["totals"]
+        specifics = stats["specifics"]
+        last_did = stats["last_did"]
+
+        max_total = max(totals.get(m.id, 0) for m in members) or 1
+        max_specific = max(specifics.get(m.id, 0) for m in members) or 1
+        now = now_local()
+
+        return {
+            m.id: _weighted_score(totals.get(m.id, 0), specifics.get(m.id, 0),
+                                  last_did.get(m.id), max_total, max_specific, now)
+            for m in members
+        }
+
+    @_pins_today
     def suggest_member_for_task(self, task_name: str) -> TaskSuggestion:
         """Suggereer wie een taak moet doen."""
-        task = db.get_task_by_name(task_name)
+        task = self._find_task(task_name)
         if not task:
             raise ValueError(f"Taak '{task_name}' niet gevonden")
 
@@ -194,14 +601,19 @@ class TaskEngine:
         if not available:
             raise ValueError("Niemand is beschikbaar!")
 
+        # Verzamel alle data één keer (niet per lid opnieuw)
+        stats = self._collect_week_stats(available, task)
+
+        member_scores = self._score_members(available, task, stats)
+
         scores = []
         for member in available:
-            score = self.calculate_weighted_score(member, task, available)
+            score = member_scores[member.id]
             scores.append(MemberScore(
                 member=member,
-                total_tasks_this_week=self.get_task_count_this_week(member),
-                specific_task_count=self.get_task_count_this_week(member, task),
-                last_did_task=self.get_last_completion(member, task),
+                total_tasks_this_week=stats["totals"][member.id],
+                specific_task_count=stats["specifics"][member.id],
+                last_did_task=stats["last_did"][member.id],
                 is_available=True,
                 weighted_score=score
             ))
@@ -244,6 +656,7 @@ class TaskEngine:
         else:
             return f"{name} is het langst geleden dat die {task.display_name} heeft gedaan."
 
+    @_pins_today
     def explain_task_assignment(self, task_name: str, member_name: Optional[str] = None) -> TaskExplanation:
         """
         Genereer uitgebreide uitleg waarom iemand een taak krijgt toegewezen.
@@ -258,63 +671,69 @@ class TaskEngine:
         Returns:
             TaskExplanation met alle vergelijkingsdata en uitleg
         """
-        task = db.get_task_by_name(task_name)
+        task = self._find_task(task_name)
         if not task:
             raise ValueError(f"Taak '{task_name}' niet gevonden")
 
-        all_members = db.get_all_members()
+        all_members = self._members_cached()
         available_members = self.get_available_members()
 
+        # Verzamel week-data voor alle leden in één keer; de scores van de
+        # beschikbare leden bepalen ook de suggestie, zodat we de data niet
+        # via suggest_member_for_task nog een keer ophalen
+        stats = self._collect_week_stats(all_members, task)
+        member_scores = self._score_members(available_members, task, stats) if available_members else {}
+
         # Bepaal wie de taak krijgt
         if member_name:
-            assigned_member = db.get_member_by_name(member_name)
+            assigned_member = self._find_member(member_name)
             if not assigned_member:
                 raise ValueError(f"Gezinslid '{member_name}' niet gevonden")
         else:
-            suggestion = self.suggest_member_for_task(task_name)
-            assigned_member = suggestion.suggested_member
+            if not available_members:
+                raise ValueError("Niemand is beschikbaar!")
+            # Zelfde keuze als suggest_member_for_task: laagste score, bij
+            # gelijke score de eerste
+            assigned_member = min(available_members, key=lambda m: member_scores[m.id])
 
         # Verzamel data voor alle gezinsleden
-        today = today_local()
+        today = _today()
         current_month = today.month
         current_year = today.year
         month_completions = db.get_completions_for_month(current_year, current_month)
 
         comparisons = []
         raw_scores = {}
+        now = now_local()
 
-        # Bereken max waarden voor de visuele balken
-        week_counts = []
-        month_counts = []
-        for member in all_members:
-            week_count = self.get_task_count_this_week(member)
-            month_count = len([c for c in month_completions
-                              if c.member_id == member.id and c.task_name == task.display_name])
-            week_counts.append(week_count)
-            month_counts.append(month_count)
+        # Tel in één doorloop per (lid, taak) hoe vaak het deze maand gedaan is
+        month_counts_map = Counter((c.member_id, c.task_name) for c in month_completions)
+
+        assigned_comp = None
 
-        max_week = max(week_counts) if week_counts else 1
-        max_month = max(month_counts) if month_counts else 1
+        # Max waarden voor de visuele balken, bijgehouden in dezelfde doorloop
+        max_week = 0
+        max_month = 0
 
+        available_ids = {m.id for m in available_members}
         for member in all_members:
-            is_available = member in available_members
+            is_available = member.id in available_ids
 
             # Taken deze week
-            tasks_week = self.get_task_count_this_week(member)
-            week_bar = self._make_bar(tasks_week, max(max_week, 6))
+            tasks_week = stats["totals"][member.id]
+            max_week = max(max_week, tasks_week)
 
             # Deze specifieke taak deze maand
-            tasks_month = len([c for c in month_completions
-                              if c.member_id == member.id and c.task_name == task.display_name])
-            month_bar = self._make_bar(tasks_month, max(max_month, 4))
+            tasks_month = month_counts_map[(member.id, task.display_name)]
+            max_month = max(max_month, tasks_month)
 
             # Dagen sinds laatste keer
-            last_completion = self.get_last_completion(member, task)
+            last_completion = stats["last_did"][member.id]
             if last_completion:
                 # Zorg dat beide timezone-aware zijn
                 if last_completion.tzinfo is None:
                     last_completion = last_completion.replace(tzinfo=TIMEZONE)
-                days_since = (now_local() - last_completion).days
+                days_since = (now - last_completion).days
                 if days_since == 0:
                     days_text = "vandaag"
                 elif days_since == 1:
@@ -327,34 +746,52 @@ class TaskEngine:
 
             # Bereken score (alleen voor beschikbare leden)
             if is_available:
-                score = self.calculate_weighted_score(member, task, available_members)
+                score = member_scores[member.id]
                 raw_scores[member.name] = round(score, 3)
             else:
                 raw_scores[member.name] = None
 
-            comparisons.append(MemberComparison(
+            comparison = MemberComparison(
                 name=member.name,
                 tasks_this_week=tasks_week,
-                tasks_this_week_bar=week_bar,
+                tasks_this_week_bar="",  # ingevuld zodra de maxima bekend zijn
                 specific_task_this_month=tasks_month,
-                specific_task_bar=month_bar,
+                specific_task_bar="",
                 days_since_task=days_since,
                 days_since_text=days_text,
                 is_assigned=(member.id == assigned_member.id),
                 is_available=is_available
-            ))
+            )
+            comparisons.append(comparison)
+            if comparison.is_assigned:
+                assigned_comp = comparison
+
+        # Balken pas nu, als de maxima over alle leden bekend zijn
+        for comp in comparisons:
+            comp.tasks_this_week_bar = self._make_bar(comp.tasks_this_week, max(max_week, 6))
+            comp.specific_task_bar = self._make_bar(comp.specific_task_this_month, max(max_month, 4))
 
         # Sorteer: toegewezen persoon eerst, dan op score
         comparisons.sort(key=lambda c: (not c.is_assigned, raw_scores.get(c.name) or 999))
 
-        # Genereer tekstuele uitleg
-        assigned_comp = next(c for c in comparisons if c.is_assigned)
+        # Genereer tekstuele uitleg (assigned_comp is al in de loop bewaard)
         others = [c for c in comparisons if not c.is_assigned and c.is_available]
 
+        # Minima en maxima van de anderen in één doorloop
+        if others:
+            min_other_week = max_other_week = others[0].tasks_this_week
+            min_other_month = max_other_month = others[0].specific_task_this_month
+            max_other_days = 0
+            for c in others:
+                min_other_week = min(min_other_week, c.tasks_this_week)
+                max_other_week = max(max_other_week, c.tasks_this_week)
+                min_other_month = min(min_other_month, c.specific_task_this_month)
+                max_other_month = max(max_other_month, c.specific_task_this_month)
+                max_other_days = max(max_other_days, c.days_since_task or 0)
+
         # Week uitleg
         if others:
             min_week = assigned_comp.tasks_this_week
-            max_other_week = max(c.tasks_this_week for c in others) if others else 0
             if min_week < max_other_week:
                 week_explanation = (
                     f"{assigned_comp.name} heeft deze week {min_week} taken gedaan, "
@@ -370,7 +807,6 @@ class TaskEngine:
         # Maand uitleg
         if others:
             min_month = assigned_comp.specific_task_this_month
-            max_other_month = max(c.specific_task_this_month for c in others) if others else 0
             if min_month < max_other_month:
                 month_explanation = (
                     f"{assigned_comp.name} heeft {task.display_name} deze maand {min_month}x gedaan, "
@@ -399,15 +835,11 @@ class TaskEngine:
         # Conclusie
         reasons = []
         if others:
-            if assigned_comp.tasks_this_week <= min(c.tasks_this_week for c in others):
+            if assigned_comp.tasks_this_week <= min_other_week:
                 reasons.append("de minste taken deze week")
-            if assigned_comp.specific_task_this_month <= min(c.specific_task_this_month for c in others):
+            if assigned_comp.specific_task_this_month <= min_other_month:
                 reasons.append(f"{task.display_name} het minst gedaan deze maand")
-            if assigned_comp.days_since_task is None or (
-                assigned_comp.days_since_task >= max(
-                    (c.days_since_task or 0) for c in others
-                )
-            ):
+            if assigned_comp.days_since_task is None or assigned_comp.days_since_task >= max_other_days:
                 reasons.append("het langst geleden")
 
         if reasons:
@@ -415,26 +847,19 @@ class TaskEngine:
         else:
             conclusion = f"→ {assigned_comp.name} heeft de laagste score en is daarom aan de beurt."
 
-        # Korte reden
-        short_reason = self._generate_reason(
-            MemberScore(
-                member=assigned_member,
-                total_tasks_this_week=assigned_comp.tasks_this_week,
-                specific_task_count=assigned_comp.specific_task_this_month,
-                last_did_task=self.get_last_completion(assigned_member, task),
-                is_available=True,
-                weighted_score=raw_scores.get(assigned_comp.name) or 0
-            ),
-            [MemberScore(
-                member=db.get_member_by_name(c.name),
-                total_tasks_this_week=c.tasks_this_week,
-                specific_task_count=c.specific_task_this_month,
-                last_did_task=None,
-                is_available=c.is_available,
-                weighted_score=raw_scores.get(c.name) or 0
-            ) for c in comparisons],
-            task
-        )
+        # Korte reden: één MemberScore per vergelijking (uit de al verzamelde
+        # data), waarvan die van de toegewezen persoon ook de suggestie is
+        members_by_name = {m.name: m for m in all_members}
+        comparison_scores = [MemberScore(
+            member=members_by_name[c.name],
+            total_tasks_this_week=c.tasks_this_week,
+            specific_task_count=c.specific_task_this_month,
+            last_did_task=stats["last_did"].get(members_by_name[c.name].id),
+            is_available=c.is_available,
+            weighted_score=raw_scores.get(c.name) or 0
+        ) for c in comparisons]
+        # comparisons is gesorteerd met de toegewezen persoon eerst
+        short_reason = self._generate_reason(comparison_scores[0], comparison_scores, task)
 
         return TaskExplanation(
             task_name=task.name,
@@ -451,11 +876,9 @@ class TaskEngine:
 
     def _make_bar(self, value: int, max_value: int, width: int = 6) -> str:
         """Maak een visuele balk voor vergelijking. █░"""
-        if max_value == 0:
-            return "░" * width
-        filled = min(int((value / max_value) * width), width)
-        return "█" * filled + "░" * (width - filled)
+        return _make_bar_cached(value, max_value, width)
 
+    @_pins_today
     def complete_task(self, member_name: str, task_name: str, completed_date: Optional[date] = None) -> Completion:
         """Registreer dat iemand een taak heeft voltooid.
 
@@ -467,23 +890,17 @@ class TaskEngine:
             task_name: Naam van de taak
             completed_date: Optioneel - datum waarop de taak is gedaan (default: vandaag)
         """
-        member = db.get_member_by_name(member_name)
+        member = self._find_member(member_name)
         if not member:
             raise ValueError(f"Gezinslid '{member_name}' niet gevonden")
 
-        task = db.get_task_by_name(task_name)
+        task = self._find_task(task_name)
         if not task:
             raise ValueError(f"Taak '{task_name}' niet gevonden")
 
         # Bepaal week nummer en datum
-        if completed_date:
-            week_number = completed_date.isocalendar()[1]
-            completion_day = completed_date
-        else:
-            week_number = self.get_current_week()
-            completion_day = today_local()
-
-        year = completion_day.isocalendar()[0]
+        completion_day = completed_date or _today()
+        year, week_number, _ = completion_day.isocalendar()
         day_of_week = completion_day.weekday()  # 0=maandag
 
         # Registreer de completion
@@ -498,19 +915,21 @@ class TaskEngine:
 
         # === AUTO-HERPLANNING ===
         # Check of er een rooster is voor deze week
-        if db.schedule_exists_for_week(week_number, year):
+        if self._schedule_exists(week_number, year):
             self._handle_rescheduling(member, task, week_number, year, day_of_week)
 
         return completion
 
     def _handle_batch_rescheduling(self, day_items: list, week_number: int, year: int,
-                                      day_of_week: int, tasks_lookup: dict):
+                                      day_of_week: int, tasks_lookup: dict,
+                                      assignments: Optional[AssignmentCache] = None,
+                                      ctx: Optional[dict] = None):
         """Handle herplanning voor een batch van completions op dezelfde dag.
 
         Dit is beter dan individuele herplanning omdat:
-        1. Alle wijzigingen worden eerst geanalyseerd
-        2. Swaps worden gedetecteerd (A deed B's taak en B deed A's taak)
-        3. Daarna worden assignments in de juiste volgorde geüpdatet
+        1. Swaps worden in één doorloop gedetecteerd en toegepast
+           (A deed B's taak en B deed A's taak)
+        2. Daarna worden de overige wijzigingen individueel herplant
 
         Args:
             day_items: Lijst van dicts met member, task, etc.
@@ -518,33 +937,55 @@ class TaskEngine:
             year: Jaar
             day_of_week: 0=maandag, 6=zondag
             tasks_lookup: Dict van task display_name -> Task object
+            assignments: Gedeelde AssignmentCache van deze week (optioneel)
+            ctx: Gedeelde week-context (zie _week_context, optioneel)
         """
-        # Haal assignments voor deze dag op (EENMALIG)
-        day_assignments = db.get_assignments_for_day(week_number, year, day_of_week)
+        if assignments is None:
+            assignments = AssignmentCache.for_week(week_number, year)
 
-        if not day_assignments:
+        # Eén completion kan geen swap zijn: direct individueel herplannen
+        if len(day_items) == 1:
+            item = day_items[0]
+            self._handle_rescheduling(
+                item["member"], item["task"], week_number, year, day_of_week,
+                tasks_lookup=tasks_lookup, assignments=assignments, ctx=ctx
+            )
             return
 
-        # Check of dit verleden is
-        today = today_local()
-        week_start = self.get_week_start(week_number)
-        completion_date = week_start + timedelta(days=day_of_week)
-        is_past = completion_date < today
+        # Assignments voor deze dag (uit de week-cache, geen extra query)
+        day_assignments = assignments.for_day(day_of_week)
+
+        if not day_assignments:
+            return
 
-        # Bouw lookup: task_name -> assignment
-        assignment_by_task = {a.task_name: a for a in day_assignments}
-        # Bouw lookup: member_id -> [assignments]
-        assignments_by_member = {}
+        # Bouw de lookups in één doorloop over de assignments van de dag:
+        # - task_id -> [assignments] (een lijst per taak zodat twee assignments
+        #   van dezelfde taak op één dag elkaar niet stilletjes overschrijven)
+        # - (member_id, tijdslot) -> [assignments], alleen voor leden uit deze
+        #   batch: van anderen wordt de eigen taak nooit opgevraagd
+        batch_member_ids = {item["member"].id for item in day_items}
+        assignments_by_task_id = defaultdict(list)
+        assignments_by_member_slot = defaultdict(list)
         for a in day_assignments:
-            if a.member_id not in assignments_by_member:
-                assignments_by_member[a.member_id] = []
-            assignments_by_member[a.member_id].append(a)
+            assignments_by_task_id[a.task_id].append(a)
+            if a.member_id in batch_member_ids:
+                a_task = tasks_lookup.get(a.task_name)
+                if a_task:
+                    assignments_by_member_slot[(a.member_id, task_slot(a_task))].append(a)
 
-        # === FASE 1: Analyseer alle completions ===
+        def assignment_for(task: Optional[Task]) -> Optional[ScheduleAssignment]:
+            if not task:
+                return None
+            matches = assignments_by_task_id.get(task.id)
+            return matches[0] if matches else None
+
+        # === FASE 1: Analyseer completions en pas swaps direct toe ===
+        # Een swap is wanneer A deed wat B zou doen EN B deed wat A zou doen.
+        # Beide helften van een swap worden in één doorloop gevonden: de swap
+        # wordt herkend zodra de tweede helft langskomt.
         # completed_task -> member die het deed
         who_did_what = {}
-        # member -> task die ze hadden moeten doen (in hetzelfde tijdslot)
-        member_original_task = {}
+        processed_members = set()
 
         for item in day_items:
             member = item["member"]
@@ -552,58 +993,40 @@ class TaskEngine:
             who_did_what[task.display_name] = member
 
             # Vind wat dit lid eigenlijk zou moeten doen (zelfde tijdslot)
-            time_slot = task.time_of_day
-            member_assignments = assignments_by_member.get(member.id, [])
-            for a in member_assignments:
+            my_original = None
+            for a in assignments_by_member_slot.get((member.id, task_slot(task)), []):
                 if a.task_name != task.display_name:
-                    orig_task = tasks_lookup.get(a.task_name)
-                    if orig_task and orig_task.time_of_day == time_slot:
-                        member_original_task[member.id] = a
-                        break
-
-        # === FASE 2: Detecteer swaps ===
-        # Een swap is wanneer A deed wat B zou doen EN B deed wat A zou doen
-        swaps = []  # [(member_A, member_B, task_A, task_B)]
-        processed_members = set()
-
-        for item in day_items:
-            member = item["member"]
-            task = item["task"]
+                    my_original = a
+                    break
 
             if member.id in processed_members:
                 continue
 
             # Vind wie deze taak oorspronkelijk zou doen
-            original_assignment = assignment_by_task.get(task.display_name)
+            original_assignment = assignment_for(task)
             if not original_assignment or original_assignment.member_id == member.id:
                 continue  # Geen swap nodig
 
             original_member_id = original_assignment.member_id
-            original_member_name = original_assignment.member_name
-
-            # Check of de originele assignee een taak van dit member heeft gedaan
-            my_original = member_original_task.get(member.id)
-            if my_original:
-                other_doer = who_did_what.get(my_original.task_name)
-                if other_doer and other_doer.id == original_member_id:
-                    # Het is een swap!
-                    swaps.append((member, other_doer, task, tasks_lookup.get(my_original.task_name)))
-                    processed_members.add(member.id)
-                    processed_members.add(original_member_id)
-
-        # === FASE 3: Pas swaps toe ===
-        for member_a, member_b, task_a, task_b in swaps:
-            # member_a deed task_a (was voor member_b)
-            # member_b deed task_b (was voor member_a)
-            assignment_a = assignment_by_task.get(task_a.display_name)
-            assignment_b = assignment_by_task.get(task_b.display_name) if task_b else None
-
-            if assignment_a:
-                db.update_assignment(assignment_a.id, member_a.id, member_a.name)
-            if assignment_b:
-                db.update_assignment(assignment_b.id, member_b.id, member_b.name)
-
-        # === FASE 4: Verwerk resterende (niet-swap) wijzigingen ===
+            if original_member_id in processed_members:
+                continue
+
+            # Check of de originele assignee al een taak van dit member heeft gedaan
+            if not my_original:
+                continue
+            other_doer = who_did_what.get(my_original.task_name)
+            if not other_doer or other_doer.id != original_member_id:
+                continue
+
+            # Het is een swap!
+            # member deed task (was voor other_doer),
+            # other_doer deed my_original (was voor member)
+            assignments.update(original_assignment.id, member.id, member.name)
+            assignments.update(my_original.id, other_doer.id, other_doer.name)
+            processed_members.add(member.id)
+            processed_members.add(original_member_id)
+
+        # === FASE 2: Verwerk resterende (niet-swap) wijzigingen ===
         for item in day_items:
             member = item["member"]
             task = item["task"]
@@ -614,12 +1037,14 @@ class TaskEngine:
             # Normale herplanning voor individuele wijziging
             self._handle_rescheduling(
                 member, task, week_number, year, day_of_week,
-                tasks_lookup=tasks_lookup
+                tasks_lookup=tasks_lookup, assignments=assignments, ctx=ctx
             )
 
     def _handle_rescheduling(self, member: Member, completed_task: Task,
                                week_number: int, year: int, day_of_week: int,
-                               tasks_lookup: Optional[dict] = None):
+                               tasks_lookup: Optional[dict] = None,
+                               assignments: Optional[AssignmentCache] = None,
+                               ctx: Optional[dict] = None):
         """Handle herplanning wanneer iemand een andere taak deed dan gepland.
 
         Scenario: Nora stond ingepland voor inruimen, maar deed dekken.
@@ -627,38 +1052,40 @@ class TaskEngine:
         - Voor VANDAAG/TOEKOMST: inruimen wordt herplant naar andere dag/persoon
         - Voor VERLEDEN: inruimen assignment wordt geüpdatet naar wie vrijkwam (swap)
         """
-        # Haal de assignments van deze dag op
-        day_assignments = db.get_assignments_for_day(week_number, year, day_of_week)
+        # Haal de assignments van deze week één keer op (hergebruikt door
+        # _reschedule_task) en pak die van deze dag
+        if assignments is None:
+            assignments = AssignmentCache.for_week(week_number, year)
+        day_assignments = assignments.for_day(day_of_week)
 
-        # Bouw tasks lookup als we die nog niet hebben (performance)
+        # Gebruik gecachte tasks lookup als we die nog niet hebben (performance)
         if not tasks_lookup:
-            all_tasks = db.get_all_tasks()
-            tasks_lookup = {t.display_name: t for t in all_tasks}
+            tasks_lookup = self._get_tasks_lookup()
 
         # Check of dit een verleden datum is
-        today = today_local()
-        week_start = self.get_week_start(week_number)
+        today = _today()
+        week_start = self.get_week_start(week_number, year)
         completion_date = week_start + timedelta(days=day_of_week)
         is_past = completion_date < today
 
-        # Vind de assignment voor de completed task
+        # Vind in één doorloop over de assignments van de dag:
+        # - de assignment voor de completed task
+        # - wat dit lid eigenlijk zou moeten doen (zelfde tijdslot)
+        time_slot = task_slot(completed_task)
         completed_assignment = None
-        for a in day_assignments:
-            if a.task_name == completed_task.display_name:
-                completed_assignment = a
-                break
-
-        # Vind wat dit lid eigenlijk zou moeten doen (zelfde tijdslot)
-        time_slot = completed_task.time_of_day
         member_original_assignment = None
 
         for a in day_assignments:
-            if a.member_id == member.id and a.task_name != completed_task.display_name:
+            if a.task_name == completed_task.display_name:
+                if completed_assignment is None:
+                    completed_assignment = a
+            elif member_original_assignment is None and a.member_id == member.id:
                 # Check of het in hetzelfde tijdslot zit (via lookup, geen DB query)
                 original_task = tasks_lookup.get(a.task_name)
-                if original_task and original_task.time_of_day == time_slot:
+                if original_task and task_slot(original_task) == time_slot:
                     member_original_assignment = a
-                    break
+            if completed_assignment and member_original_assignment:
+                break
 
         # Update de completed_assignment naar de persoon die het echt deed
         original_assignee = None
@@ -668,7 +1095,7 @@ class TaskEngine:
             original_assignee = completed_assignment.member_name
             original_assignee_id = completed_assignment.member_id
             # Update de assignment naar de persoon die het echt deed
-            db.update_assignment(completed_assignment.id, member.id, member.name)
+            assignments.update(completed_assignment.id, member.id, member.name)
 
         # Handle de originele assignment van dit lid
         if member_original_assignment:
@@ -676,8 +1103,8 @@ class TaskEngine:
                 # VERLEDEN: Direct swappen - geef de taak aan wie vrijkwam
                 if original_assignee and original_assignee_id:
                     # Directe swap: geef member's originele taak aan de vrijgekomen persoon
-                    db.update_assignment(member_original_assignment.id,
-                                        original_assignee_id, original_assignee)
+                    assignments.update(member_original_assignment.id,
+                                       original_assignee_id, original_assignee)
                 # Als niemand vrijkwam, laat de assignment zoals die is
                 # (wordt later mogelijk door een andere completion geüpdatet)
             else:
@@ -688,13 +1115,17 @@ class TaskEngine:
                     year,
                     day_of_week,
                     preferred_member=original_assignee,
-                    tasks_lookup=tasks_lookup
+                    tasks_lookup=tasks_lookup,
+                    assignments=assignments,
+                    ctx=ctx
                 )
 
     def _reschedule_task(self, original_assignment: ScheduleAssignment,
                           week_number: int, year: int, current_day: int,
                           preferred_member: Optional[str] = None,
-                          tasks_lookup: Optional[dict] = None):
+                          tasks_lookup: Optional[dict] = None,
+                          assignments: Optional[AssignmentCache] = None,
+                          ctx: Optional[dict] = None):
         """Herplan een taak naar een andere dag/persoon.
 
         BELANGRIJK: Herplanning gebeurt alleen VOORUIT in de tijd.
@@ -704,22 +1135,27 @@ class TaskEngine:
         1. De preferred_member (als die beschikbaar is en tijdslot vrij heeft)
         2. Dezelfde dag, ander beschikbaar kind
         3. Volgende dagen in de week
+
+        Met ctx (zie _week_context) worden leden, afwezigheden en
+        beschikbaarheid van de week gedeeld tussen herplanningen.
         """
-        # Gebruik lookup dict als beschikbaar, anders ophalen
-        if tasks_lookup:
-            task = tasks_lookup.get(original_assignment.task_name)
-        else:
-            task = db.get_task_by_name(original_assignment.task_name)
+        # Gebruik lookup dict als beschikbaar, anders de gecachte lookup
+        if not tasks_lookup:
+            tasks_lookup = self._get_tasks_lookup()
+        task = tasks_lookup.get(original_assignment.task_name)
         if not task:
             return
 
-        week_start = self.get_week_start(week_number)
+        if assignments is None:
+            assignments = AssignmentCache.for_week(week_number, year)
+
+        week_start = self.get_week_start(week_number, year)
         week_end = week_start + timedelta(days=6)
 
         # === FORWARD-ONLY CHECK ===
         # Je kan niet herplannen naar het verleden. Als de completion_day in het
         # verleden ligt, start dan vanaf vandaag.
-        today = today_local()
+        today = _today()
         today_weekday = today.weekday()
 
         # Check of we in dezelfde week zitten
@@ -728,115 +1164,118 @@ class TaskEngine:
             earliest_day = max(current_day, today_weekday)
         else:
             # De week is volledig in het verleden - niets te herplannen
-            db.delete_assignment(original_assignment.id)
+            assignments.delete(original_assignment.id)
             return
 
         # Als we op zondag zijn (dag 6), is er geen ruimte meer om te herplannen
         if earliest_day > 6:
-            db.delete_assignment(original_assignment.id)
+            assignments.delete(original_assignment.id)
             return
 
-        members = db.get_all_members()
-        week_absences = db.get_absences_for_week(week_start, week_end)
+        # Leden en beschikbaarheid (één keer per week-context berekend)
+        ctx = self._week_context(week_number, year, ctx)
+        available_by_name = ctx["available_by_name"]
 
-        # Bereken beschikbaarheid
-        day_availability = self._calculate_day_availability(members, week_start, week_absences)
+        # Alle bestaande assignments van de week (actueel: eerdere updates
+        # zijn ook in de cache verwerkt)
+        all_assignments = assignments.assignments
+        slot_bit = task_slot_bit(task)
 
-        # Haal alle bestaande assignments op voor de week (VERS ophalen na update)
-        all_assignments = db.get_schedule_for_week(week_number, year)
-
-        # Bouw tasks lookup als we die nog niet hebben
-        if not tasks_lookup:
-            all_tasks = db.get_all_tasks()
-            tasks_lookup = {t.display_name: t for t in all_tasks}
-
-        # Track hoeveel taken per persoon deze week heeft
-        member_counts = {m.name: 0 for m in members}
+        # Dagen waarop deze taak al (via een andere assignment) staat: daar kan
+        # hij niet heen (UNIQUE op week, jaar, dag en taak)
+        taken_days = 0
         for a in all_assignments:
-            if a.id != original_assignment.id:  # Exclude de te herplannen assignment
-                member_counts[a.member_name] = member_counts.get(a.member_name, 0) + 1
-
-        # Track welke tijdslots al bezet zijn per dag per persoon
-        member_day_slots = {day_idx: {m.name: set() for m in members} for day_idx in range(7)}
-        for a in all_assignments:
-            if a.id != original_assignment.id:
-                a_task = tasks_lookup.get(a.task_name)
-                if a_task:
-                    member_day_slots[a.day_of_week][a.member_name].add(a_task.time_of_day)
-
-        time_slot = task.time_of_day
-        day_name = DAY_NAMES[earliest_day]
-        available_today = day_availability.get(day_name, [])
-
-        # Prioriteit 1: preferred_member (degene wiens taak werd overgenomen)
-        if preferred_member:
-            for m in available_today:
-                if m.name == preferred_member:
-                    if time_slot not in member_day_slots[earliest_day].get(m.name, set()):
-                        # Preferred member kan het vandaag doen!
-                        # Als we naar een andere dag moeten, verwijder en maak nieuwe assignment
-                        if earliest_day != original_assignment.day_of_week:
-                            db.delete_assignment(original_assignment.id)
-                            db.add_assignment(
-                                week_number=week_number,
-                                year=year,
-                                day_of_week=earliest_day,
-                                task_id=task.id,
-                                task_name=task.display_name,
-                                member_id=m.id,
-                                member_name=m.name
-                            )
-                        else:
-                            db.update_assignment(original_assignment.id, m.id, m.name)
-                        return
-                    break  # Preferred member gevonden maar kan niet, ga door met anderen
-
-        # Prioriteit 2: dezelfde dag (earliest_day), ander beschikbaar kind
-        for m in sorted(available_today, key=lambda x: member_counts.get(x.name, 0)):
-            if m.id == original_assignment.member_id:
-                continue  # Skip de originele persoon
-            if time_slot not in member_day_slots[earliest_day].get(m.name, set()):
-                # Deze persoon kan het doen!
-                if earliest_day != original_assignment.day_of_week:
-                    db.delete_assignment(original_assignment.id)
-                    db.add_assignment(
-                        week_number=week_number,
-                        year=year,
-                        day_of_week=earliest_day,
-                        task_id=task.id,
-                        task_name=task.display_name,
-                        member_id=m.id,
-                        member_name=m.name
-                    )
-                else:
-                    db.update_assignment(original_assignment.id, m.id, m.name)
-                return
-
-        # Als earliest_day niet lukt, probeer de resterende dagen van de week
-        for day_idx in range(earliest_day + 1, 7):
-            day_name = DAY_NAMES[day_idx]
-            available = day_availability.get(day_name, [])
-
-            for m in sorted(available, key=lambda x: member_counts.get(x.name, 0)):
-                if time_slot not in member_day_slots[day_idx].get(m.name, set()):
-                    # Deze persoon kan het op deze dag doen!
-                    # Verwijder de oude assignment en maak een nieuwe voor de nieuwe dag
-                    db.delete_assignment(original_assignment.id)
-                    db.add_assignment(
-                        week_number=week_number,
-                        year=year,
-                        day_of_week=day_idx,
-                        task_id=task.id,
-                        task_name=task.display_name,
-                        member_id=m.id,
-                        member_name=m.name
-                    )
-                    return
+            if a.task_id == original_assignment.task_id and a.id != original_assignment.id:
+                taken_days |= 1 << a.day_of_week
+
+        def candidates():
+            """Haalbare (dag, lid) paren in prioriteitsvolgorde, lui opgebouwd."""
+            # Prioriteit 1: preferred_member (degene wiens taak werd overgenomen).
+            # Hiervoor zijn alleen diens tijdslots op earliest_day nodig; de
+            # tellingen en slots van iedereen worden pas opgebouwd als dit niet lukt.
+            if preferred_member and not taken_days >> earliest_day & 1:
+                m = available_by_name[earliest_day].get(preferred_member)
+                if m:
+                    busy = 0
+                    for a in all_assignments:
+                        if (a.day_of_week == earliest_day and a.member_name == m.name
+                                and a.id != original_assignment.id):
+                            a_task = tasks_lookup.get(a.task_name)
+                            if a_task:
+                                busy |= task_slot_bit(a_task)
+                    if not busy & slot_bit:
+                        yield earliest_day, m
+
+            # Hoeveel taken per persoon deze week heeft (bijgehouden door de
+            # cache), zonder de te herplannen assignment
+            member_counts = assignments.member_counts().copy()
+            member_counts[original_assignment.member_name] -= 1
+
+            # Track welke tijdslots al bezet zijn per dag per persoon: per dag
+            # een lijst bitmaskers op ledenindex (geen tuple-keys hashen)
+            members = ctx["members"]
+            member_idx = {m.name: i for i, m in enumerate(members)}
+            slot_masks = [[0] * len(members) for _ in range(7)]
+            original_id = original_assignment.id
+            for a in all_assignments:
+                if a.id != original_id:
+                    i = member_idx.get(a.member_name)
+                    a_task = tasks_lookup.get(a.task_name)
+                    if i is not None and a_task:
+                        slot_masks[a.day_of_week][i] |= task_slot_bit(a_task)
+
+            # De kandidaatvolgorde (minste taken eerst, stabiel gesorteerd zodat
+            # bij gelijke aantallen de ledenvolgorde blijft) wordt één keer
+            # bepaald en daarna voor elke dag hergebruikt.
+            count_order = sorted(range(len(members)), key=lambda i: member_counts.get(members[i].name, 0))
+
+            # Prioriteit 2: dezelfde dag (earliest_day), ander beschikbaar kind.
+            # Prioriteit 3: de resterende dagen van de week, iedereen.
+            for day_idx in range(earliest_day, 7):
+                if taken_days >> day_idx & 1:
+                    continue
+                exclude_member_id = original_assignment.member_id if day_idx == earliest_day else None
+                available = available_by_name[day_idx]
+                day_slots = slot_masks[day_idx]
+                for i in count_order:
+                    m = members[i]
+                    if (m.name in available and m.id != exclude_member_id
+                            and not day_slots[i] & slot_bit):
+                        yield day_idx, m
+
+        # De eerste haalbare kandidaat krijgt de taak (eventueel op een andere dag)
+        for day_idx, m in candidates():
+            assignments.reassign(original_assignment.id, day_idx, m.id, m.name)
+            return
 
         # Als we hier komen, kon de taak niet herplant worden binnen de week
         # Verwijder de assignment - de eerlijkheid wordt over weken gebalanceerd
-        db.delete_assignment(original_assignment.id)
+        assignments.delete(original_assignment.id)
+
+    def _pick_least_loaded(self, candidates: list, member_counts: dict, day_slots: dict,
+                           slot_bit: int, exclude_member_id: Optional[str] = None) -> Optional[Member]:
+        """Kies het lid met de minste taken dat dit tijdslot nog vrij heeft.
 
+        Eén doorloop in plaats van sorteren: bij gelijke aantallen wint de
+        eerste in de lijst (zelfde resultaat als een stabiele sort). Iemand
+        met 0 taken is altijd optimaal, dus dan stoppen we meteen.
+        """
+        best = None
+        best_count = None
+        for m in candidates:
+            if m.id == exclude_member_id:
+                continue
+            if day_slots.get(m.name, 0) & slot_bit:
+                continue
+            count = member_counts.get(m.name, 0)
+            if best is None or count < best_count:
+                best = m
+                best_count = count
+                if count == 0:
+                    break
+        return best
+
+    @_pins_today
     def regenerate_schedule(self, week_number: Optional[int] = None) -> dict:
         """Regenereer het rooster voor een week (verwijdert bestaand rooster).
 
@@ -845,7 +1284,7 @@ class TaskEngine:
         if week_number is None:
             week_number = self.get_current_week()
 
-        year = today_local().year
+        year = _today().year
 
         # Verwijder bestaand rooster
         db.delete_schedule_for_week(week_number, year)
@@ -853,6 +1292,7 @@ class TaskEngine:
         # Genereer nieuw rooster via get_week_schedule (die slaat automatisch op)
         return self.get_week_schedule()
 
+    @_pins_today
     def complete_tasks_bulk(self, tasks_data: list[dict]) -> list[Completion]:
         """Registreer meerdere taken in één transactie.
 
@@ -869,29 +1309,29 @@ class TaskEngine:
         completions_to_add = []
         validated_items = []  # Voor herplanning na opslaan
 
-        # Bouw tasks lookup voor performance
-        all_tasks = db.get_all_tasks()
-        tasks_lookup = {t.display_name: t for t in all_tasks}
-        tasks_by_name = {t.name: t for t in all_tasks}
+        # Gecachte tasks lookup voor performance
+        tasks_lookup = self._get_tasks_lookup()
+
+        # Resolve elke unieke naam maar één keer (ook als dezelfde persoon of
+        # taak vaak in de batch voorkomt valt hooguit één fuzzy lookup per naam
+        # terug op de database)
+        members_by_input = {name: self._find_member(name)
+                            for name in {item["member_name"] for item in tasks_data}}
+        tasks_by_input = {name: self._find_task(name)
+                          for name in {item["task_name"] for item in tasks_data}}
 
         for item in tasks_data:
-            member = db.get_member_by_name(item["member_name"])
+            member = members_by_input[item["member_name"]]
             if not member:
                 raise ValueError(f"Gezinslid '{item['member_name']}' niet gevonden")
 
-            task = db.get_task_by_name(item["task_name"])
+            task = tasks_by_input[item["task_name"]]
             if not task:
                 raise ValueError(f"Taak '{item['task_name']}' niet gevonden")
 
             # Bepaal week nummer en datum
-            completed_date = item.get("completed_date")
-            if completed_date:
-                week_number = completed_date.isocalendar()[1]
-                year = completed_date.isocalendar()[0]
-            else:
-                completed_date = today_local()
-                week_number = self.get_current_week()
-                year = completed_date.isocalendar()[0]
+            completed_date = item.get("completed_date") or _today()
+            year, week_number, _ = completed_date.isocalendar()
 
             completions_to_add.append({
                 "task_id": task.id,
@@ -916,20 +1356,42 @@ class TaskEngine:
         # === BATCH HERPLANNING ===
         # Groepeer items per (week, year, day) zodat alle wijzigingen voor dezelfde dag
         # in één keer worden verwerkt - dit voorkomt dat wijziging 1 invloed heeft op wijziging 2
-        items_by_day = {}
+        items_by_day = defaultdict(list)
         for item in validated_items:
-            key = (item["week_number"], item["year"], item["day_of_week"])
-            if key not in items_by_day:
-                items_by_day[key] = []
-            items_by_day[key].append(item)
-
-        # Verwerk elke dag als batch
+            items_by_day[(item["week_number"], item["year"], item["day_of_week"])].append(item)
+
+        # Verwerk elke dag als batch. Per week wordt maar één keer gecheckt of
+        # er een rooster is en worden de assignments maar één keer opgehaald
+        # (daarna in-memory bijgewerkt en pas aan het eind weggeschreven);
+        # None = geen rooster voor die week.
+        # Ook leden, afwezigheden en beschikbaarheid worden per week gedeeld.
+        week_assignments = {}
+        week_contexts = {}
         for (week_number, year, day_of_week), day_items in items_by_day.items():
-            if db.schedule_exists_for_week(week_number, year):
+            week_key = (week_number, year)
+            if week_key not in week_assignments:
+                week_assignments[week_key] = (
+                    AssignmentCache.for_week(week_number, year, deferred=True)
+                    if self._schedule_exists(week_number, year) else None
+                )
+            if week_assignments[week_key] is not None:
                 self._handle_batch_rescheduling(
-                    day_items, week_number, year, day_of_week, tasks_lookup
+                    day_items, week_number, year, day_of_week, tasks_lookup,
+                    assignments=week_assignments[week_key],
+                    ctx=week_contexts.setdefault(week_key, {})
                 )
 
+        # Alle herplanningen van de batch in één transactie per week opslaan.
+        # De completions zijn dan al opgeslagen: een mislukte herplanning mag
+        # de request niet alsnog laten falen (het rooster blijft dan zoals het was)
+        for (week_number, year), assignments in week_assignments.items():
+            if assignments is None:
+                continue
+            try:
+                assignments.flush()
+            except Exception as e:
+                print(f"Herplanning week {week_number}/{year} niet opgeslagen: {e}")
+
         return completions
 
     def register_absence(
@@ -940,7 +1402,7 @@ class TaskEngine:
         reason: Optional[str] = None
     ):
         """Registreer afwezigheid van een gezinslid."""
-        member = db.get_member_by_name(member_name)
+        member = self._find_member(member_name)
         if not member:
             raise ValueError(f"Gezinslid '{member_name}' niet gevonden")
 
@@ -953,22 +1415,33 @@ class TaskEngine:
         })
 
     def get_weekly_summary(self) -> dict:
-        """Geef een overzicht van de taken deze week."""
+        """Geef een overzicht van de taken deze week.
+
+        Eén GROUP BY query voor alle leden; het resultaat wordt gecachet
+        totdat er een completion bijkomt of verdwijnt.
+        """
         week_number = self.get_current_week()
-        members = db.get_all_members()
-
-        summary = {}
-        for member in members:
-            completions = db.get_completions_for_member(member.id, week_number)
-            summary[member.name] = {
-                "total": len(completions),
-                "tasks": {}
-            }
-            for completion in completions:
-                task_name = completion.task_name
-                if task_name not in summary[member.name]["tasks"]:
-                    summary[member.name]["tasks"][task_name] = 0
-                summary[member.name]["tasks"][task_name] += 1
+        return self._cached_reference(
+            ("weekly_summary", week_number),
+            db.get_completions_version(),
+            lambda: self._build_weekly_summary(week_number),
+            ttl=SUMMARY_CACHE_TTL,
+        )["items"]
+
+    def _build_weekly_summary(self, week_number: int) -> dict:
+        """Bouw het weekoverzicht op uit de gegroepeerde aantallen."""
+        members = self._members_cached()
+        names_by_id = {m.id: m.name for m in members}
+
+        summary = {m.name: {"total": 0, "tasks": {}} for m in members}
+        for member_id, task_name, count in db.get_completion_summary_for_week(week_number):
+            name = names_by_id.get(member_id)
+            if name is None:
+                continue
+            # Elk (lid, taak) paar komt maar één keer voor in de GROUP BY
+            entry = summary[name]
+            entry["total"] += count
+            entry["tasks"][task_name] = count
 
         return summary
 
@@ -980,9 +1453,9 @@ class TaskEngine:
         swap_date: date
     ):
         """Vraag een ruil aan."""
-        requester = db.get_member_by_name(requester_name)
-        target = db.get_member_by_name(target_name)
-        task = db.get_task_by_name(task_name)
+        requester = self._find_member(requester_name)
+        target = self._find_member(target_name)
+        task = self._find_task(task_name)
 
         if not requester:
             raise ValueError(f"'{requester_name}' niet gevonden")
@@ -1009,7 +1482,7 @@ class TaskEngine:
 
     def get_pending_swaps(self, member_name: str):
         """Haal alle openstaande ruil verzoeken op voor een lid."""
-        member = db.get_member_by_name(member_name)
+        member = self._find_member(member_name)
         if not member:
             return []
         return db.get_pending_swaps_for_member(member.id)
@@ -1021,8 +1494,8 @@ class TaskEngine:
 
         Dit past de schedule_assignments aan zodat de taken worden geruild.
         """
-        member1 = db.get_member_by_name(member1_name)
-        member2 = db.get_member_by_name(member2_name)
+        member1 = self._find_member(member1_name)
+        member2 = self._find_member(member2_name)
 
         if not member1:
             raise ValueError(f"Gezinslid '{member1_name}' niet gevonden")
@@ -1031,16 +1504,15 @@ class TaskEngine:
         if member1.id == member2.id:
             raise ValueError("Je kunt niet met jezelf ruilen!")
 
-        task1 = db.get_task_by_name(member1_task)
-        task2 = db.get_task_by_name(member2_task)
+        task1 = self._find_task(member1_task)
+        task2 = self._find_task(member2_task)
 
         if not task1:
             raise ValueError(f"Taak '{member1_task}' niet gevonden")
         if not task2:
             raise ValueError(f"Taak '{member2_task}' niet gevonden")
 
-        week_number = swap_date.isocalendar()[1]
-        year = swap_date.isocalendar()[0]
+        year, week_number, _ = swap_date.isocalendar()
         day_of_week = swap_date.weekday()
 
         # Update de assignments in de database
@@ -1062,6 +1534,7 @@ class TaskEngine:
             "member2_new_task": member1_task
         }
 
+    @_pins_today
     def undo_task_completion(self, member_name: str, task_name: str,
                               completed_date: Optional[date] = None) -> dict:
         """Maak een specifieke taak voltooiing ongedaan.
@@ -1077,30 +1550,27 @@ class TaskEngine:
         Returns:
             dict met success, message, en info over herplanning
         """
-        member = db.get_member_by_name(member_name)
+        # Naam-lookups via de gecachte referentiedata (geen query bij een hit)
+        member = self._find_member(member_name)
         if not member:
             raise ValueError(f"Gezinslid '{member_name}' niet gevonden")
 
-        task = db.get_task_by_name(task_name)
+        task = self._find_task(task_name)
         if not task:
             raise ValueError(f"Taak '{task_name}' niet gevonden")
 
         if completed_date is None:
-            completed_date = today_local()
+            completed_date = _today()
 
-        week_number = completed_date.isocalendar()[1]
-        year = completed_date.isocalendar()[0]
+        year, week_number, _ = completed_date.isocalendar()
         day_of_week = completed_date.weekday()
 
-        # Zoek de completion
-        completions = db.get_completions_for_week(week_number)
-        target_completion = None
-        for c in completions:
-            if (c.member_name == member.name and
-                c.task_name == task.display_name and
-                c.completed_at.date() == completed_date):
-                target_completion = c
-                break
+        # Haal de completion, afwezigheden en rooster op in één database connectie
+        # (bij dubbele completions telt de eerste)
+        week_start = self.get_week_start(week_number, year)
+        ctx = db.get_undo_context(week_number, year, week_start, week_start + timedelta(days=6),
+                                  member.id, task.id, completed_date)
+        target_completion = ctx["completion"]
 
         if not target_completion:
             return {
@@ -1116,12 +1586,11 @@ class TaskEngine:
         # De taak moet weer op het rooster komen
         rescheduled_to = None
 
-        if db.schedule_exists_for_week(week_number, year):
+        if ctx["schedule_exists"]:
             # Check of deze taak in het rooster staat
-            assignments = db.get_assignments_for_day(week_number, year, day_of_week)
             task_assignment = None
-            for a in assignments:
-                if a.task_name == task.display_name:
+            for a in ctx["schedule"]:
+                if a.day_of_week == day_of_week and a.task_name == task.display_name:
                     task_assignment = a
                     break
 
@@ -1138,7 +1607,7 @@ class TaskEngine:
             else:
                 # De assignment was verwijderd (kon niet herplant worden)
                 # Probeer de taak nu te herplannen naar iemand
-                new_member = self._find_member_for_task(task, week_number, year, day_of_week)
+                new_member = self._find_member_for_task(task, week_number, year, day_of_week, ctx=ctx)
                 if new_member:
                     db.add_assignment(
                         week_number=week_number,
@@ -1159,48 +1628,66 @@ class TaskEngine:
             "rescheduled_to": rescheduled_to
         }
 
-    def _find_member_for_task(self, task: Task, week_number: int, year: int,
-                                day_of_week: int, tasks_lookup: Optional[dict] = None) -> Optional[Member]:
-        """Vind een geschikt lid om een taak te doen op een specifieke dag."""
-        week_start = self.get_week_start(week_number)
-        week_end = week_start + timedelta(days=6)
+    def _week_context(self, week_number: int, year: int, ctx: Optional[dict] = None) -> dict:
+        """Vul een week-context aan met leden, afwezigheden en beschikbaarheid.
 
-        members = db.get_all_members()
-        week_absences = db.get_absences_for_week(week_start, week_end)
-        day_availability = self._calculate_day_availability(members, week_start, week_absences)
+        Wat al in ctx staat wordt hergebruikt en wat ontbreekt wordt één keer
+        opgehaald en in ctx bewaard, zodat herhaalde aanroepen binnen dezelfde
+        actie niets opnieuw berekenen. Bewust niet over requests heen gecachet:
+        afwezigheden en het rooster worden ook buiten de engine gewijzigd.
+        """
+        if ctx is None:
+            ctx = {}
+        if "day_availability" not in ctx:
+            week_start = self.get_week_start(week_number, year)
+            if "absences" not in ctx:
+                ctx["absences"] = db.get_absences_for_week(week_start, week_start + timedelta(days=6))
+            ctx["members"] = self._members_cached()
+            ctx["day_availability"] = self._calculate_day_availability(
+                ctx["members"], week_start, ctx["absences"]
+            )
+            # Per dag naam -> lid, voor O(1) beschikbaarheidschecks
+            ctx["available_by_name"] = [{m.name: m for m in available}
+                                        for available in ctx["day_availability"]]
+        return ctx
+
+    def _find_member_for_task(self, task: Task, week_number: int, year: int,
+                                day_of_week: int, tasks_lookup: Optional[dict] = None,
+                                ctx: Optional[dict] = None) -> Optional[Member]:
+        """Vind een geschikt lid om een taak te doen op een specifieke dag.
 
-        day_name = DAY_NAMES[day_of_week]
-        available = day_availability.get(day_name, [])
+        Met ctx (zie db.get_undo_context) worden de al opgehaalde afwezigheden
+        en het rooster hergebruikt in plaats van opnieuw opgevraagd.
+        """
+        ctx = self._week_context(week_number, year, ctx)
+        if "schedule" not in ctx:
+            ctx["schedule"] = db.get_schedule_for_week(week_number, year)
+        members = ctx["members"]
+        available = ctx["day_availability"][day_of_week]
 
         if not available:
             return None
 
-        # Bouw tasks lookup als we die nog niet hebben (performance)
+        # Gebruik gecachte tasks lookup als we die nog niet hebben (performance)
         if not tasks_lookup:
-            all_tasks = db.get_all_tasks()
-            tasks_lookup = {t.display_name: t for t in all_tasks}
+            tasks_lookup = self._get_tasks_lookup()
 
         # Tel taken per persoon
-        all_assignments = db.get_schedule_for_week(week_number, year)
+        all_assignments = ctx["schedule"]
         member_counts = {m.name: 0 for m in members}
-        member_day_slots = {m.name: set() for m in members}
+        member_day_slots = defaultdict(int)
 
         for a in all_assignments:
             member_counts[a.member_name] = member_counts.get(a.member_name, 0) + 1
             if a.day_of_week == day_of_week:
                 a_task = tasks_lookup.get(a.task_name)
                 if a_task:
-                    member_day_slots[a.member_name].add(a_task.time_of_day)
-
-        time_slot = task.time_of_day
+                    member_day_slots[a.member_name] |= task_slot_bit(a_task)
 
         # Vind lid met minste taken en beschikbare tijdslot
-        for m in sorted(available, key=lambda x: member_counts.get(x.name, 0)):
-            if time_slot not in member_day_slots.get(m.name, set()):
-                return m
-
-        return None
+        return self._pick_least_loaded(available, member_counts, member_day_slots, task_slot_bit(task))
 
+    @_pins_today
     def get_week_schedule(self) -> dict:
         """
         Haal het weekrooster op of genereer een nieuw rooster.
@@ -1215,11 +1702,11 @@ class TaskEngine:
         - completed: welke taken al zijn gedaan
         - ascii_overview: ASCII/emoji overzicht
         """
-        today = today_local()
+        today = _today()
         week_number = self.get_current_week()
         year = today.year
         month = today.month
-        week_start = self.get_week_start(week_number)
+        week_start = self.get_week_start(week_number, year)
         week_end = week_start + timedelta(days=6)
 
         # === SINGLE BATCH QUERY - alle data in 1 connectie ===
@@ -1253,7 +1740,7 @@ class TaskEngine:
             # Genereer nieuw rooster en sla op (met maandelijkse balancering)
             schedule, assignments_to_save = self._generate_new_schedule(
                 members, tasks, all_completions, day_availability, week_start,
-                month_completions=month_completions
+                month_completions=month_completions, tasks_lookup=tasks_lookup
             )
             # Sla op in database
             db.save_schedule_for_week(week_number, year, assignments_to_save)
@@ -1289,30 +1776,32 @@ class TaskEngine:
             "schedule": schedule,
             "ascii_overview": ascii_overview,
             "member_totals": member_week_counts,
-            "day_availability": {day: [m.name for m in members] for day, members in day_availability.items()},
+            "day_availability": {DAY_NAMES[day_idx]: [m.name for m in available]
+                                 for day_idx, available in enumerate(day_availability)},
             "missed_tasks": missed_tasks_formatted
         }
 
-    def _calculate_day_availability(self, members: list, week_start: date, week_absences: list) -> dict:
-        """Bereken per dag wie beschikbaar is."""
-        day_availability = {}
-        for day_idx in range(7):
-            day_date = week_start + timedelta(days=day_idx)
-            day_name = DAY_NAMES[day_idx]
-            available = []
-            for m in members:
-                is_absent = any(
-                    a.member_id == m.id and a.start_date <= day_date <= a.end_date
-                    for a in week_absences
-                )
-                if not is_absent:
-                    available.append(m)
-            day_availability[day_name] = available
-        return day_availability
+    def _calculate_day_availability(self, members: list, week_start: date, week_absences: list) -> list:
+        """Bereken per dag wie beschikbaar is.
+
+        Returns:
+            Lijst van 7 lijsten met beschikbare leden, geïndexeerd op dag (0=maandag)
+        """
+        # Eén doorloop over de afwezigheden: per lid een 7-bit mask van de
+        # afwezige dagen, elke afwezigheid is één OR van een bereik aan bits
+        absent_mask = defaultdict(int)
+        for a in week_absences:
+            first = max((a.start_date - week_start).days, 0)
+            last = min((a.end_date - week_start).days, 6)
+            if first <= last:
+                absent_mask[a.member_id] |= (1 << (last + 1)) - (1 << first)
+
+        masks = [(m, absent_mask.get(m.id, 0)) for m in members]
+        return [[m for m, mask in masks if not mask >> day_idx & 1] for day_idx in range(7)]
 
     def _reschedule_missed_tasks(self, schedule: dict, week_number: int, year: int,
                                    week_start: date, members: list, tasks_lookup: dict,
-                                   day_availability: dict) -> dict:
+                                   day_availability: list) -> dict:
         """Herplan gemiste taken naar toekomstige dagen in de week.
 
         Als een taak gemist is (dag voorbij, niet gedaan), wordt deze:
@@ -1327,7 +1816,7 @@ class TaskEngine:
         Returns:
             Updated schedule dict met herplande taken toegevoegd
         """
-        today = today_local()
+        today = _today()
         today_idx = (today - week_start).days
 
         # Vind alle gemiste taken
@@ -1444,7 +1933,7 @@ class TaskEngine:
 
             for target_day_idx in range(max(0, today_idx), 7):
                 target_day_name = DAY_NAMES[target_day_idx]
-                available = day_availability.get(target_day_name, [])
+                available = day_availability[target_day_idx]
 
                 # Check taak-specifieke regels (weekday-only, spacing)
                 if not is_valid_day_for_task(task_name, target_day_idx, task):
@@ -1567,10 +2056,8 @@ class TaskEngine:
         for day_name in schedule:
             schedule[day_name]["tasks"].sort(key=lambda t: time_order.get(t.get("time_of_day", "avond"), 1))
 
-        return schedule
-
     def _build_schedule_from_stored(self, stored_assignments: list, completions: list,
-                                      week_start: date, day_availability: dict,
+                                      week_start: date, day_availability: list,
                                       tasks_lookup: dict) -> dict:
         """Bouw het schedule-object op basis van opgeslagen assignments.
 
@@ -1579,7 +2066,7 @@ class TaskEngine:
 
         Detecteert ook gemiste taken (dag is voorbij, taak niet gedaan) en markeert deze.
         """
-        today = today_local()
+        today = _today()
         schedule = {}
         for day_idx in range(7):
             day_name = DAY_NAMES[day_idx]
@@ -1592,6 +2079,12 @@ class TaskEngine:
         # Track welke completions al zijn gematcht met een assignment
         matched_completions = set()
 
+        # Lookup (taak, datum) -> eerste completion, i.p.v. per assignment alle
+        # completions te doorlopen
+        completions_by_task_date = {}
+        for c in completions:
+            completions_by_task_date.setdefault((c.task_name, c.completed_at.date()), c)
+
         # Groepeer assignments per dag
         for assignment in stored_assignments:
             day_idx = assignment.day_of_week
@@ -1601,12 +2094,11 @@ class TaskEngine:
             # Check of deze taak al is gedaan (door wie dan ook)
             completed = False
             done_by = assignment.member_name  # Default: wie was ingepland
-            for c in completions:
-                if c.task_name == assignment.task_name and c.completed_at.date() == day_date:
-                    completed = True
-                    done_by = c.member_name
-                    matched_completions.add(c.id)
-                    break
+            c = completions_by_task_date.get((assignment.task_name, day_date))
+            if c:
+                completed = True
+                done_by = c.member_name
+                matched_completions.add(c.id)
 
             # Check of dit een gemiste taak is (dag voorbij, niet gedaan)
             is_missed = not completed and day_date < today
@@ -1650,15 +2142,15 @@ class TaskEngine:
             })
 
         # Sorteer taken per dag op time_of_day
-        time_order = {"ochtend": 0, "middag": 1, "avond": 2}
         for day_name in schedule:
-            schedule[day_name]["tasks"].sort(key=lambda t: time_order.get(t.get("time_of_day", "avond"), 1))
+            schedule[day_name]["tasks"].sort(key=_time_order_key)
 
         return schedule
 
     def _generate_new_schedule(self, members: list, tasks: list, completions: list,
-                                 day_availability: dict, week_start: date,
-                                 month_completions: list = None) -> tuple:
+                                 day_availability: list, week_start: date,
+                                 month_completions: list = None,
+                                 tasks_lookup: Optional[dict] = None) -> tuple:
         """Genereer een nieuw weekrooster met eerlijke verdeling.
 
         De verdeling houdt rekening met:
@@ -1692,57 +2184,61 @@ class TaskEngine:
                     task_counts[c.task_name] = task_counts.get(c.task_name, 0) + 1
 
         # Track welke tijdslots al bezet zijn per dag per persoon
-        # Format: {day_idx: {member_name: set(time_slots)}}
-        member_day_slots = {day_idx: {m.name: set() for m in members} for day_idx in range(7)}
+        # Format: {day_idx: {member_name: slot bitmask}} (zie SLOT_BITS)
+        member_day_slots = defaultdict(lambda: defaultdict(int))
 
         # Bepaal voor elke taak op welke dagen deze moet worden gedaan
         task_days = self._distribute_tasks_over_week(tasks, day_availability, custom_rules)
 
+        # Lookups van display_name -> Task en naam -> Member, één keer opgebouwd
+        # voor alle dagen (de task lookup hergebruiken als de caller die al heeft)
+        if tasks_lookup is None:
+            tasks_lookup = {t.display_name: t for t in tasks}
+        members_by_name = {m.name: m for m in members}
+
+        # Completions één keer groeperen per datum, plus lookup
+        # (taak, datum) -> wie het (als eerste) deed
+        completions_by_date = defaultdict(list)
+        done_today = {}
+        for c in completions:
+            c_date = c.completed_at.date()
+            completions_by_date[c_date].append(c)
+            done_today.setdefault((c.task_name, c_date), c.member_name)
+
+        # Sorteer taken één keer (niet per dag): koken EERST zodat wie kookt
+        # geen avondtaken krijgt (koken blokkeert de "avond" slot via
+        # TASK_BLOCKS_SLOTS). Stabiel, dus verder blijft de volgorde gelijk
+        tasks_in_priority = sorted(tasks, key=lambda t: t.name != "koken")
+
         for day_idx in range(7):
             day_name = DAY_NAMES[day_idx]
             day_date = week_start + timedelta(days=day_idx)
-            available_members = day_availability[day_name]
+            available_members = day_availability[day_idx]
 
             if not available_members:
                 continue
 
-            today_tasks = [t for t in tasks if day_idx in task_days.get(t.name, [])]
-
-            # Sorteer taken: koken EERST zodat wie kookt geen avondtaken krijgt
-            # (koken blokkeert de "avond" slot via TASK_BLOCKS_SLOTS)
-            def task_priority(t):
-                if t.name == "koken":
-                    return 0  # Koken eerst
-                return 1
-            today_tasks = sorted(today_tasks, key=task_priority)
+            # Taken van vandaag in de al gesorteerde volgorde (koken eerst)
+            today_tasks = [t for t in tasks_in_priority if day_idx in task_days.get(t.name, ())]
 
             # PRE-BLOCK: Blokkeer slots voor ALLE completions van vandaag
             # (inclusief extra taken die niet gepland waren, bijv. koken)
-            tasks_lookup_by_display = {t.display_name: t for t in tasks}
-            for c in completions:
-                if c.completed_at.date() == day_date and c.member_name in member_day_slots[day_idx]:
+            day_completions = completions_by_date.get(day_date, [])
+            for c in day_completions:
+                if c.member_name in members_by_name:
                     # Vind de taak om te weten welke slots te blokkeren
-                    task_obj = tasks_lookup_by_display.get(c.task_name)
+                    task_obj = tasks_lookup.get(c.task_name)
                     if task_obj:
-                        blocked_slots = TASK_BLOCKS_SLOTS.get(task_obj.name, [task_obj.time_of_day])
-                        for slot in blocked_slots:
-                            member_day_slots[day_idx][c.member_name].add(slot)
+                        member_day_slots[day_idx][c.member_name] |= blocked_slot_mask(task_obj)
 
             # Track welke taken vandaag al verwerkt zijn (door scheduled tasks)
             matched_task_names = set()
 
             for task in today_tasks:
                 # Check of al gedaan vandaag
-                already_done = False
-                done_by = None
-                for c in completions:
-                    if c.task_name == task.display_name and c.completed_at.date() == day_date:
-                        already_done = True
-                        done_by = c.member_name
-                        matched_task_names.add(task.display_name)
-                        break
-
-                if already_done:
+                done_by = done_today.get((task.display_name, day_date))
+                if done_by is not None:
+                    matched_task_names.add(task.display_name)
                     schedule[day_name]["tasks"].append({
                         "task_name": task.display_name,
                         "assigned_to": done_by,
@@ -1751,7 +2247,7 @@ class TaskEngine:
                         "time_of_day": task.time_of_day
                     })
                     # Ook opslaan in assignments (als record)
-                    member = next((m for m in members if m.name == done_by), None)
+                    member = members_by_name.get(done_by)
                     if member:
                         assignments_to_save.append({
                             "day_of_week": day_idx,
@@ -1762,9 +2258,7 @@ class TaskEngine:
                         })
                         # Blokkeer tijdslot(s) ook voor voltooide taken
                         # Bijv: wie kookt (gedaan) krijgt geen uitruimen/dekken meer
-                        blocked_slots = TASK_BLOCKS_SLOTS.get(task.name, [task.time_of_day])
-                        for slot in blocked_slots:
-                            member_day_slots[day_idx][done_by].add(slot)
+                        member_day_slots[day_idx][done_by] |= blocked_slot_mask(task)
                 else:
                     # Kies beschikbare persoon met minste taken EN beschikbare tijdslot
                     # Nu ook met maandelijkse balancering per taaktype en custom rules
@@ -1783,9 +2277,7 @@ class TaskEngine:
                             task_counts = member_month_task_counts[assigned.name]
                             task_counts[task.display_name] = task_counts.get(task.display_name, 0) + 1
                         # Blokkeer tijdslot(s) - sommige taken blokkeren meerdere slots
-                        blocked_slots = TASK_BLOCKS_SLOTS.get(task.name, [task.time_of_day])
-                        for slot in blocked_slots:
-                            member_day_slots[day_idx][assigned.name].add(slot)
+                        member_day_slots[day_idx][assigned.name] |= blocked_slot_mask(task)
 
                         schedule[day_name]["tasks"].append({
                             "task_name": task.display_name,
@@ -1803,10 +2295,7 @@ class TaskEngine:
 
             # Voeg "extra" completions toe - taken die gedaan zijn maar niet gepland waren voor vandaag
             # Dit zorgt ervoor dat alle gedane taken meetellen, ook na regenerate
-            tasks_lookup = {t.display_name: t for t in tasks}
-            for c in completions:
-                if c.completed_at.date() != day_date:
-                    continue
+            for c in day_completions:
                 if c.task_name in matched_task_names:
                     continue  # Al verwerkt via scheduled task
 
@@ -1825,9 +2314,8 @@ class TaskEngine:
                 matched_task_names.add(c.task_name)
 
         # Sorteer taken per dag op time_of_day
-        time_order = {"ochtend": 0, "middag": 1, "avond": 2}
         for day_name in schedule:
-            schedule[day_name]["tasks"].sort(key=lambda t: time_order.get(t.get("time_of_day", "avond"), 1))
+            schedule[day_name]["tasks"].sort(key=_time_order_key)
 
         return schedule, assignments_to_save
 
@@ -1844,14 +2332,14 @@ class TaskEngine:
         3. Minste keer deze specifieke taak gedaan deze MAAND (eerlijke verdeling)
         4. Minste taken deze WEEK (als maand gelijk is)
         """
-        time_slot = task.time_of_day
+        slot_bit = task_slot_bit(task)
         task_name = task.display_name
 
         # Filter op wie dit tijdslot nog vrij heeft vandaag
         # STRIKT: als niemand vrij is, return None (geen dubbele avondtaken!)
         eligible = [
             m for m in available_members
-            if time_slot not in member_day_slots.get(m.name, set())
+            if not member_day_slots.get(m.name, 0) & slot_bit
         ]
 
         if not eligible:
@@ -1877,12 +2365,13 @@ class TaskEngine:
             week_count = member_week_counts.get(m.name, 0)
             return (month_task_count, week_count)
 
-        sorted_eligible = sorted(eligible, key=sort_key)
+        # Eén key per lid en alleen het minimum: een volledige sort is niet nodig
+        keys = [sort_key(m) for m in eligible]
+        best_score = min(keys)
 
         # Randomiseer tussen leden met gelijke scores om variatie te krijgen
         # Dit voorkomt dat dezelfde persoon steeds dezelfde taak krijgt
-        best_score = sort_key(sorted_eligible[0])
-        tied_members = [m for m in sorted_eligible if sort_key(m) == best_score]
+        tied_members = [m for m, key in zip(eligible, keys) if key == best_score]
 
         return random.choice(tied_members)
 
@@ -1973,7 +2462,7 @@ class TaskEngine:
                     counts[name] += 1
         return counts
 
-    def _distribute_tasks_over_week(self, tasks: list, day_availability: dict,
+    def _distribute_tasks_over_week(self, tasks: list, day_availability: list,
                                       custom_rules: list = None) -> dict:
         """
         Verdeel taken flexibel over de week.
@@ -1987,6 +2476,17 @@ class TaskEngine:
         - Skip_day rules: taak wordt overgeslagen op bepaalde dagen (bijv. schoonmaakdagen)
         - Spacing rules voor karton/glas (minstens X dagen ertussen)
         - BALANCERING: taken worden zo gelijk mogelijk verdeeld over dagen
+
+        Heuristische beam search: per taak worden alle toegestane
+        dag-combinaties geprobeerd vanuit elke tussenstand, waarbij standen
+        met dezelfde belasting per dag worden samengevoegd. Alleen de
+        DISTRIBUTION_BEAM_WIDTH (8) beste tussenstanden gaan door naar de
+        volgende taak, dus het optimum is niet gegarandeerd, maar de
+        rekentijd blijft begrensd. Uit de eindstanden wint de verdeling met
+        de meeste geplande taken en daarna de kleinste som van kwadraten van
+        de dagbelasting; bij gelijke stand wint de vroegste dag. De uitkomst
+        kan daardoor afwijken van de vroegere greedy verdeling (die per taak
+        steeds de minst drukke dagen koos).
         """
         custom_rules = custom_rules or []
         task_days = {}
@@ -1994,12 +2494,15 @@ class TaskEngine:
         # Sorteer taken op target (hoogste eerst), zodat dagelijkse taken eerst komen
         sorted_tasks = sorted(tasks, key=lambda t: -t.weekly_target)
 
-        # Track hoeveel taken per dag al zijn toegewezen (voor balans)
-        day_task_count = {day_idx: 0 for day_idx in range(7)}
+        # Dagen waar minstens 1 persoon beschikbaar is als bitmask, één keer bepaald
+        open_mask = sum(1 << day_idx for day_idx in range(7) if day_availability[day_idx])
 
-        # Bereken ideale taken per dag (totaal / 7 dagen)
-        total_weekly_tasks = sum(t.weekly_target for t in tasks)
-        ideal_per_day = total_weekly_tasks / 7
+        # Per load-vector (taken per dag) de rangorde: (-aantal taken, som van
+        # kwadraten), per stap bijgewerkt in plaats van steeds opnieuw geteld.
+        # Per taak één laag met de vorige stand en de gekozen dagen, zodat de
+        # beste verdeling terug te volgen is
+        states = {(0,) * 7: (0, 0)}
+        layers = []
 
         for task in sorted_tasks:
             target = task.weekly_target
@@ -2008,132 +2511,71 @@ class TaskEngine:
             if target <= 0:
                 continue
 
-            # Bepaal geschikte dagen (waar minstens 1 persoon beschikbaar is)
-            suitable_days = []
-            for day_idx, day_name in enumerate(DAY_NAMES):
-                if not day_availability[day_name]:
-                    continue  # Niemand beschikbaar
-
-                # Check weekday-only regel
-                if task.name in WEEKDAY_ONLY_TASKS:
-                    if day_idx >= 5:  # Weekend (zaterdag=5, zondag=6)
-                        continue
-
-                # Check skip_day rules (bijv. schoonmaakdagen)
-                if self._is_skip_day(task.name, day_idx, custom_rules):
-                    continue
+            # Bepaal geschikte dagen met één AND: weekday-only taken (uitruimen_ochtend)
+            # alleen ma-vr, daarna zonder skip_day rules (bijv. schoonmaakdagen)
+            allowed = open_mask & (WEEKDAY_ONLY_MASK if task.name in WEEKDAY_ONLY_TASKS else ALL_DAYS_MASK)
+            for day_idx in range(7):
+                if allowed >> day_idx & 1 and self._is_skip_day(task.name, day_idx, custom_rules):
+                    allowed &= ~(1 << day_idx)
 
-                # Check max taken per dag limiet
-                if day_task_count[day_idx] >= MAX_TASKS_PER_DAY:
-                    continue  # Dag zit al vol
-
-                suitable_days.append(day_idx)
-
-            if not suitable_days:
+            if not allowed:
                 continue
 
-            # Check of er spacing requirements zijn
-            min_spacing = TASK_MIN_SPACING.get(task.name)
+            # Kandidaten per aantal dagen, van target naar beneden: als de spacing
+            # of volle dagen het target onhaalbaar maken, accepteren we minder
+            # (niet relaxen - regels zijn regels)
+            size = min(target, bin(allowed).count("1"))
+            min_spacing = TASK_MIN_SPACING.get(task.name, 0)
+            options = [_day_subsets(allowed, k, min_spacing) for k in range(size, 0, -1)]
+
+            next_states = {}
+            back = {}
+            for loads, (neg_total, squares) in states.items():
+                # Dagen die al MAX_TASKS_PER_DAY taken hebben zitten vol;
+                # als mask is dat één AND per kandidaat
+                full_mask = 0
+                for day_idx, count in enumerate(loads):
+                    if count >= MAX_TASKS_PER_DAY:
+                        full_mask |= 1 << day_idx
+                feasible = ((),)
+                for subsets in options:
+                    fits = [days for mask, days in subsets if not mask & full_mask]
+                    if fits:
+                        feasible = fits
+                        break
 
-            # Verdeel taken gelijkmatig over beschikbare dagen
-            if target >= len(suitable_days):
-                # Taak moet (bijna) elke dag: gebruik alle beschikbare dagen
-                # Bij spacing requirements, respecteer die
-                if min_spacing:
-                    selected = self._select_days_with_spacing(suitable_days, target, min_spacing)
-                else:
-                    selected = suitable_days[:target]
-                task_days[task.name] = selected
-                for day_idx in selected:
-                    day_task_count[day_idx] += 1
-            else:
-                # Verspreid taken zo goed mogelijk met STERKE voorkeur voor minst belaste dagen
-                selected = []
-
-                if min_spacing:
-                    # Gebruik spacing-aware selectie met load balancing
-                    selected = self._select_days_with_spacing(suitable_days, target, min_spacing, day_task_count)
-                    for day_idx in selected:
-                        day_task_count[day_idx] += 1
-                else:
-                    # Balancerende selectie: kies steeds de dag met minste taken
-                    for i in range(target):
-                        best_day = None
-                        best_score = float('inf')
-
-                        for day_idx in suitable_days:
-                            if day_idx in selected:
-                                continue
-                            # HARDE LIMIET CHECK
-                            if day_task_count[day_idx] >= MAX_TASKS_PER_DAY:
-                                continue
-
-                            # Score gebaseerd op huidige belasting vs ideaal
-                            current_load = day_task_count[day_idx]
-                            # Hoe verder boven ideaal, hoe hoger de penalty
-                            load_penalty = max(0, current_load - ideal_per_day) * 2
-                            # Basis score is gewoon de huidige load
-                            score = current_load + load_penalty
-
-                            if score < best_score:
-                                best_score = score
-                                best_day = day_idx
-
-                        if best_day is not None:
-                            selected.append(best_day)
-                            day_task_count[best_day] += 1
-
-                task_days[task.name] = sorted(selected)
+                for days in feasible:
+                    new_loads = list(loads)
+                    extra_squares = 0
+                    for day_idx in days:
+                        # (n + 1)^2 - n^2 = 2n + 1
+                        extra_squares += 2 * new_loads[day_idx] + 1
+                        new_loads[day_idx] += 1
+                    new_loads = tuple(new_loads)
+                    if new_loads not in next_states:
+                        next_states[new_loads] = (neg_total - len(days), squares + extra_squares)
+                        back[new_loads] = (loads, days)
+
+            # Begrens de zoekruimte: alleen de beste tussenstanden (meeste taken,
+            # daarna meest gelijk verdeeld) gaan door naar de volgende taak.
+            # nsmallest is stabiel, dus bij gelijke stand blijft de vroegste dag
+            if len(next_states) > DISTRIBUTION_BEAM_WIDTH:
+                next_states = dict(heapq.nsmallest(DISTRIBUTION_BEAM_WIDTH, next_states.items(),
+                                                   key=itemgetter(1)))
+
+            layers.append((task.name, back))
+            states = next_states
+
+        # Beste eindstand: meeste taken gepland, daarna zo gelijk mogelijk verdeeld
+        best = min(states, key=states.get)
+        for task_name, layer in reversed(layers):
+            best, days = layer[best]
+            task_days[task_name] = list(days)
 
         return task_days
 
-    def _select_days_with_spacing(self, suitable_days: list, target: int,
-                                    min_spacing: int, day_task_count: dict = None) -> list:
-        """Selecteer dagen met minimale spacing ertussen EN load balancing.
-
-        Args:
-            suitable_days: Lijst van geschikte dag-indices
-            target: Hoeveel dagen we moeten selecteren
-            min_spacing: Minimale afstand tussen dagen
-            day_task_count: Optioneel - dict met taken per dag voor load balancing
-
-        Returns:
-            Lijst van geselecteerde dag-indices
-        """
-        if not suitable_days:
-            return []
-
-        selected = []
-
-        # Filter eerst dagen die al vol zitten
-        if day_task_count:
-            available_days = [d for d in suitable_days if day_task_count.get(d, 0) < MAX_TASKS_PER_DAY]
-            # Sorteer op load (minste taken eerst)
-            sorted_days = sorted(available_days, key=lambda d: day_task_count.get(d, 0))
-        else:
-            sorted_days = sorted(suitable_days)
-
-        # Greedy selectie met spacing check, voorkeur voor minst belaste dagen
-        for day_idx in sorted_days:
-            if len(selected) >= target:
-                break
-
-            # Check spacing met al geselecteerde dagen
-            valid = True
-            for selected_day in selected:
-                if abs(day_idx - selected_day) < min_spacing:
-                    valid = False
-                    break
-
-            if valid:
-                selected.append(day_idx)
-
-        # Als we niet genoeg dagen konden selecteren met spacing,
-        # accepteer wat we hebben (niet relaxen - regels zijn regels)
-        return sorted(selected)
-
     def _generate_ascii_schedule(self, schedule: dict, week_start: date,
-                                   day_availability: dict, member_totals: dict,
+                                   day_availability: list, member_totals: dict,
                                    members: list = None, tasks: list = None,
                                    month_completions: list = None,
                                    missed_tasks: list = None) -> str:
@@ -2144,17 +2586,17 @@ class TaskEngine:
         week_num = self.get_current_week()
         lines.append("╔═══════════════════════════════════════════════════╗")
         lines.append(f"║  📅 WEEKROOSTER week {week_num:<2}                          ║")
-        lines.append("╠═══════════════════════════════════════════════════╣")
+        lines.append(ASCII_SECTION)
 
-        today = today_local()
+        today = _today()
         # Gebruik meegegeven members of haal ze op (fallback)
-        all_members = members if members else db.get_all_members()
+        all_members = members if members else self._members_cached()
 
         for day_idx, day_name in enumerate(DAY_NAMES):
             day_data = schedule[day_name]
             day_date = week_start + timedelta(days=day_idx)
             emoji = day_data["emoji"]
-            available = day_availability.get(day_name, [])
+            available = day_availability[day_idx]
 
             # Markeer vandaag
             if day_date == today:
@@ -2168,7 +2610,8 @@ class TaskEngine:
             lines.append(f"║ {header:<48}║")
 
             # Toon afwezigen als er iemand niet beschikbaar is
-            absent = [m.name for m in all_members if m not in available]
+            available_ids = {m.id for m in available}
+            absent = [m.name for m in all_members if m.id not in available_ids]
             if absent:
                 absent_str = ", ".join(absent)
                 lines.append(f"║    🚫 Afwezig: {absent_str:<33}║")
@@ -2193,13 +2636,13 @@ class TaskEngine:
                     lines.append(f"║    {line:<46}║")
 
             if day_idx < 6:
-                lines.append("║───────────────────────────────────────────────────║")
+                lines.append(ASCII_DIVIDER)
 
         # Verzaakte taken sectie (indien aanwezig)
         if missed_tasks:
-            lines.append("╠═══════════════════════════════════════════════════╣")
+            lines.append(ASCII_SECTION)
             lines.append("║  ⚠️  VERZAAKTE TAKEN DEZE WEEK                     ║")
-            lines.append("║───────────────────────────────────────────────────║")
+            lines.append(ASCII_DIVIDER)
             for mt in missed_tasks:
                 original_day = DAY_NAMES[mt.original_day][:3]
                 if mt.expired:
@@ -2212,12 +2655,13 @@ class TaskEngine:
                 lines.append(f"║    {line:<46}║")
 
         # Maandoverzicht per taak per persoon
-        lines.append("╠═══════════════════════════════════════════════════╣")
-        month_stats = self._get_monthly_task_stats(members=all_members, tasks=tasks, completions=month_completions)
+        lines.append(ASCII_SECTION)
+        month_stats = self._get_monthly_task_stats(members=all_members, tasks=tasks,
+                                                   completions=month_completions, today=today)
         month_name = MONTH_NAMES[today.month].upper()
         lines.append(f"║  📊 STAND {month_name:<38}║")
         lines.append("║                    Nora  Linde Fenna              ║")
-        lines.append("║───────────────────────────────────────────────────║")
+        lines.append(ASCII_DIVIDER)
 
         for task_name, stats in month_stats.items():
             # Kort de taaknaam af indien nodig
@@ -2232,11 +2676,14 @@ class TaskEngine:
         return "\n".join(lines)
 
     def _get_monthly_task_stats(self, members: list = None, tasks: list = None,
-                                   completions: list = None) -> dict:
-        """Bereken per taak hoeveel elke persoon heeft gedaan deze maand."""
-        import calendar
+                                   completions: list = None, today: date = None) -> dict:
+        """Bereken per taak hoeveel elke persoon heeft gedaan deze maand.
 
-        today = today_local()
+        Zonder meegegeven completions worden die van de maand gecachet
+        totdat er een completion bijkomt of verdwijnt.
+        """
+        if today is None:
+            today = _today()
         year = today.year
         month = today.month
 
@@ -2244,16 +2691,25 @@ class TaskEngine:
         _, days_in_month = calendar.monthrange(year, month)
         weeks_in_month = days_in_month / 7
 
-        # Gebruik meegegeven completions of haal op (fallback)
+        # Gebruik meegegeven completions of haal op (fallback, gecachet)
         if completions is None:
-            completions = db.get_completions_for_month(year, month)
+            completions = self._cached_reference(
+                ("month_completions", year, month),
+                db.get_completions_version(),
+                lambda: db.get_completions_for_month(year, month),
+                ttl=SUMMARY_CACHE_TTL,
+            )["items"]
 
         # Gebruik meegegeven data of haal op (fallback)
         if tasks is None:
-            tasks = db.get_all_tasks()
+            tasks = self._tasks_cached()
         if members is None:
-            members = db.get_all_members()
-        member_names = [m.name for m in members]
+            members = self._members_cached()
+        member_names = tuple(m.name for m in members)
+
+        # Tel in één doorloop per (taak, persoon) hoe vaak het gedaan is.
+        # Op task_name (display_name) want task_id kan veranderen na reset
+        done_counts = Counter((c.task_name, c.member_name) for c in completions)
 
         # Bouw de stats op
         stats = {}
@@ -2264,16 +2720,11 @@ class TaskEngine:
             if task.weekly_target > 0 and monthly_target_per_person == 0:
                 monthly_target_per_person = 1
 
-            stats[task.display_name] = {}
-            for name in member_names:
-                # Tel hoeveel deze persoon deze taak heeft gedaan
-                # Vergelijk op task_name (display_name) want task_id kan veranderen na reset
-                done = sum(1 for c in completions
-                          if c.member_name == name and c.task_name == task.display_name)
-                stats[task.display_name][name] = {
-                    "done": done,
-                    "target": monthly_target_per_person
-                }
+            display_name = task.display_name
+            stats[display_name] = {
+                name: {"done": done_counts[(display_name, name)], "target": monthly_target_per_person}
+                for name in member_names
+            }
 
         return stats
 
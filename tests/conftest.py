@@ -128,7 +128,9 @@ class MockDatabase:
         self.absences: list[Absence] = []
         self.schedule_assignments: list[ScheduleAssignment] = []
         self._completion_id_counter = 1
+        self._completions_version = 0
         self._assignment_id_counter = 1
+        self._schedules_version = 0
 
         # Configureerbare "huidige datum" voor tests
         self._current_date = date(2026, 1, 19)  # Een maandag
@@ -185,6 +187,23 @@ class MockDatabase:
     def get_completions_for_week(self, week_number: int) -> list[Completion]:
         return [c for c in self.completions if c.week_number == week_number]
 
+    def get_completion_counts_for_week(self, week_number: int) -> dict[tuple[str, str], int]:
+        counts = {}
+        for c in self.get_completions_for_week(week_number):
+            key = (c.member_id, c.task_id)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def get_completion_summary_for_week(self, week_number: int) -> list[tuple[str, str, int]]:
+        counts = {}
+        for c in sorted(self.get_completions_for_week(week_number), key=lambda c: c.completed_at):
+            key = (c.member_id, c.task_name)
+            counts[key] = counts.get(key, 0) + 1
+        return [(member_id, task_name, count) for (member_id, task_name), count in counts.items()]
+
+    def get_completions_version(self) -> int:
+        return self._completions_version
+
     def get_completions_for_month(self, year: int, month: int) -> list[Completion]:
         return [c for c in self.completions
                 if c.completed_at.year == year and c.completed_at.month == month]
@@ -196,6 +215,14 @@ class MockDatabase:
             return None
         return max(matching, key=lambda c: c.completed_at)
 
+    def get_last_completions_for_task(self, task_id: str, member_ids: list[str]) -> dict:
+        last = {}
+        for c in self.completions:
+            if c.task_id == task_id and c.member_id in member_ids:
+                if c.member_id not in last or c.completed_at > last[c.member_id]:
+                    last[c.member_id] = c.completed_at
+        return last
+
     def add_completion(self, data: dict) -> Completion:
         completed_date = data.get("completed_date", self._current_date)
         if isinstance(completed_date, date) and not isinstance(completed_date, datetime):
@@ -213,6 +240,7 @@ class MockDatabase:
             week_number=data["week_number"]
         )
         self._completion_id_counter += 1
+        self._completions_version += 1
         self.completions.append(completion)
         return completion
 
@@ -226,6 +254,7 @@ class MockDatabase:
         for i, c in enumerate(self.completions):
             if c.id == completion_id:
                 self.completions.pop(i)
+                self._completions_version += 1
                 return True
         return False
 
@@ -236,6 +265,10 @@ class MockDatabase:
                 return a
         return None
 
+    def get_absent_member_ids_for_date(self, check_date: date) -> set[str]:
+        return {a.member_id for a in self.absences
+                if a.start_date <= check_date <= a.end_date}
+
     def get_absences_for_week(self, week_start: date, week_end: date) -> list[Absence]:
         return [a for a in self.absences
                 if a.start_date <= week_end and a.end_date >= week_start]
@@ -253,6 +286,9 @@ class MockDatabase:
         return absence
 
     # Schedule Assignments
+    def get_schedules_version(self) -> int:
+        return self._schedules_version
+
     def schedule_exists_for_week(self, week_number: int, year: int) -> bool:
         return any(a.week_number == week_number and a.year == year
                   for a in self.schedule_assignments)
@@ -282,13 +318,17 @@ class MockDatabase:
             self._assignment_id_counter += 1
             self.schedule_assignments.append(assignment)
             results.append(assignment)
+        self._schedules_version += 1
         return results
 
     def delete_schedule_for_week(self, week_number: int, year: int) -> int:
         before = len(self.schedule_assignments)
         self.schedule_assignments = [a for a in self.schedule_assignments
                                      if not (a.week_number == week_number and a.year == year)]
-        return before - len(self.schedule_assignments)
+        deleted = before - len(self.schedule_assignments)
+        if deleted:
+            self._schedules_version += 1
+        return deleted
 
     def update_assignment(self, assignment_id: str, member_id: str, member_name: str) -> bool:
         for a in self.schedule_assignments:
@@ -309,6 +349,38 @@ class MockDatabase:
                 return True
         return False
 
+    def reassign_assignment(self, assignment_id: str, *, day_of_week: int,
+                            member_id: str, member_name: str) -> bool:
+        for idx, a in enumerate(self.schedule_assignments):
+            if a.id == assignment_id:
+                self.schedule_assignments[idx] = ScheduleAssignment(
+                    id=a.id,
+                    week_number=a.week_number,
+                    year=a.year,
+                    day_of_week=day_of_week,
+                    task_id=a.task_id,
+                    task_name=a.task_name,
+                    member_id=member_id,
+                    member_name=member_name,
+                    created_at=a.created_at
+                )
+                return True
+        return False
+
+    def apply_assignment_changes(self, changes: list[dict]) -> int:
+        changed = 0
+        for change in changes:
+            action = change["action"]
+            if action == "delete":
+                changed += self.delete_assignment(change["id"])
+            elif action == "reassign":
+                changed += self.reassign_assignment(change["id"], day_of_week=change["day_of_week"],
+                                                    member_id=change["member_id"],
+                                                    member_name=change["member_name"])
+            else:
+                changed += self.update_assignment(change["id"], change["member_id"], change["member_name"])
+        return changed
+
     def delete_assignment(self, assignment_id: str) -> bool:
         for i, a in enumerate(self.schedule_assignments):
             if a.id == assignment_id:
@@ -354,6 +426,18 @@ class MockDatabase:
             "month_completions": self.get_completions_for_month(year, month)
         }
 
+    def get_undo_context(self, week_number: int, year: int, week_start: date, week_end: date,
+                         member_id: str, task_id: str, completed_date: date) -> dict:
+        schedule = self.get_schedule_for_week(week_number, year)
+        return {
+            "completion": next((c for c in self.completions
+                                if c.member_id == member_id and c.task_id == task_id
+                                and c.completed_at.date() == completed_date), None),
+            "absences": self.get_absences_for_week(week_start, week_end),
+            "schedule_exists": len(schedule) > 0,
+            "schedule": schedule
+        }
+
     # Missed tasks (stub - niet kritisch voor fairness tests)
     def get_missed_tasks_for_week(self, week_number: int, year: int) -> list:
         return []
@@ -384,26 +468,36 @@ def patched_engine(mock_db):
         get_task_by_name=mock_db.get_task_by_name,
         get_completions_for_member=mock_db.get_completions_for_member,
         get_completions_for_week=mock_db.get_completions_for_week,
+        get_completion_counts_for_week=mock_db.get_completion_counts_for_week,
+        get_completion_summary_for_week=mock_db.get_completion_summary_for_week,
+        get_completions_version=mock_db.get_completions_version,
         get_completions_for_month=mock_db.get_completions_for_month,
         get_last_completion_for_task=mock_db.get_last_completion_for_task,
+        get_last_completions_for_task=mock_db.get_last_completions_for_task,
         add_completion=mock_db.add_completion,
         add_completions_bulk=mock_db.add_completions_bulk,
         delete_completion=mock_db.delete_completion,
         get_absence_for_date=mock_db.get_absence_for_date,
+        get_absent_member_ids_for_date=mock_db.get_absent_member_ids_for_date,
         get_absences_for_week=mock_db.get_absences_for_week,
         add_absence=mock_db.add_absence,
+        get_schedules_version=mock_db.get_schedules_version,
         schedule_exists_for_week=mock_db.schedule_exists_for_week,
         get_schedule_for_week=mock_db.get_schedule_for_week,
         get_assignments_for_day=mock_db.get_assignments_for_day,
         save_schedule_for_week=mock_db.save_schedule_for_week,
         delete_schedule_for_week=mock_db.delete_schedule_for_week,
         update_assignment=mock_db.update_assignment,
+        reassign_assignment=mock_db.reassign_assignment,
         delete_assignment=mock_db.delete_assignment,
         delete_assignment_for_task=mock_db.delete_assignment_for_task,
         add_assignment=mock_db.add_assignment,
+        apply_assignment_changes=mock_db.apply_assignment_changes,
         get_week_schedule_data=mock_db.get_week_schedule_data,
+        get_undo_context=mock_db.get_undo_context,
         get_missed_tasks_for_week=mock_db.get_missed_tasks_for_week,
         add_missed_task=mock_db.add_missed_task,
+        get_all_custom_rules=lambda: [],
     ):
         with patch.multiple(
             'src.task_engine',
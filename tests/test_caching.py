@@ -0,0 +1,203 @@
+"""
+Tests voor de caches in de TaskEngine.
+
+De engine cachet bijna-statische data (zoals de takenlijst) zodat de
+hot paths niet steeds opnieuw de database hoeven te raadplegen.
+"""
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+from src import database, task_engine
+from src.task_engine import AssignmentCache
+
+
+class TestTasksLookupCache:
+    """Test de gecachte task lookup."""
+
+    def test_lookup_is_reused(self, patched_engine, mock_db):
+        """Zonder wijzigingen wordt dezelfde lookup hergebruikt."""
+        engine = patched_engine
+
+        first = engine._get_tasks_lookup()
+        second = engine._get_tasks_lookup()
+
+        assert first is second
+        assert "inruimen" in first
+
+    def test_lookup_invalidated_on_task_change(self, patched_engine, mock_db):
+        """Na een wijziging van de tasks tabel wordt de lookup opnieuw opgebouwd."""
+        engine = patched_engine
+
+        first = engine._get_tasks_lookup()
+        mock_db.tasks = mock_db.tasks[:-1]  # "koken" verwijderd
+        with patch.object(database, "_tasks_version", database.get_tasks_version()):
+            database.bump_tasks_version()
+            second = engine._get_tasks_lookup()
+
+        assert second is not first
+        assert "koken" not in second
+
+
+class TestAssignmentCache:
+    """Test de week-cache van assignments die bij herplanning wordt gebruikt."""
+
+    def test_update_writes_through(self, patched_engine, mock_db):
+        """Een update gaat naar de database én naar de in-memory kopie."""
+        engine = patched_engine
+        engine.get_week_schedule()
+        week_number = engine.get_current_week()
+        year = mock_db.schedule_assignments[0].year
+
+        cache = AssignmentCache.for_week(week_number, year)
+        target = cache.assignments[0]
+        other = next(m for m in mock_db.members if m.id != target.member_id)
+
+        cache.reassign(target.id, 6, other.id, other.name)
+
+        stored = next(a for a in mock_db.schedule_assignments if a.id == target.id)
+        cached = next(a for a in cache.assignments if a.id == target.id)
+        for a in (stored, cached):
+            assert a.day_of_week == 6
+            assert a.member_id == other.id
+
+    def test_deferred_changes_written_on_flush(self, patched_engine, mock_db):
+        """Met deferred=True gaat een wijziging pas bij flush naar de database."""
+        engine = patched_engine
+        engine.get_week_schedule()
+        week_number = engine.get_current_week()
+        year = mock_db.schedule_assignments[0].year
+
+        cache = AssignmentCache.for_week(week_number, year, deferred=True)
+        target = cache.assignments[0]
+        other = next(m for m in mock_db.members if m.id != target.member_id)
+
+        cache.update(target.id, other.id, other.name)
+        stored = next(a for a in mock_db.schedule_assignments if a.id == target.id)
+        assert stored.member_id == target.member_id
+
+        cache.flush()
+        stored = next(a for a in mock_db.schedule_assignments if a.id == target.id)
+        assert stored.member_id == other.id
+        assert cache.pending == []
+
+    def test_member_counts_follow_changes(self, patched_engine, mock_db):
+        """De tellingen per lid worden bijgewerkt in plaats van opnieuw geteld."""
+        engine = patched_engine
+        engine.get_week_schedule()
+        week_number = engine.get_current_week()
+        year = mock_db.schedule_assignments[0].year
+
+        cache = AssignmentCache.for_week(week_number, year)
+        cache.member_counts()
+        first, second = cache.assignments[0], cache.assignments[1]
+        other = next(m for m in mock_db.members if m.id != first.member_id)
+
+        cache.reassign(first.id, 6, other.id, other.name)
+        cache.delete(second.id)
+
+        expected = Counter(a.member_name for a in cache.assignments)
+        assert +cache.member_counts() == expected
+
+
+class TestWeeklySummaryCache:
+    """Test de cache van het weekoverzicht."""
+
+    def test_summary_is_reused(self, patched_engine, mock_db):
+        """Zonder nieuwe completions wordt hetzelfde overzicht teruggegeven."""
+        engine = patched_engine
+
+        assert engine.get_weekly_summary() is engine.get_weekly_summary()
+
+    def test_summary_invalidated_on_completion(self, patched_engine, mock_db):
+        """Een nieuwe completion is direct zichtbaar in het overzicht."""
+        engine = patched_engine
+
+        before = engine.get_weekly_summary()
+        assert before["Nora"]["total"] == 0
+
+        engine.complete_task("Nora", "dekken")
+        after = engine.get_weekly_summary()
+
+        assert after["Nora"]["total"] == 1
+        assert after["Nora"]["tasks"] == {"dekken": 1}
+
+
+class TestPinnedToday:
+    """Test dat een engine-actie vandaag maar één keer bepaalt."""
+
+    def test_bulk_completion_reads_today_once(self, patched_engine, mock_db):
+        """complete_tasks_bulk vraagt de datum één keer op, ook met herplanning."""
+        engine = patched_engine
+        engine.get_week_schedule()
+
+        today_spy = MagicMock(side_effect=mock_db.today_local)
+        with patch.object(task_engine, "today_local", today_spy):
+            engine.complete_tasks_bulk([
+                {"member_name": "Nora", "task_name": "dekken"},
+                {"member_name": "Linde", "task_name": "inruimen"},
+            ])
+
+        assert today_spy.call_count == 1
+
+
+    def test_week_schedule_reads_today_once(self, patched_engine, mock_db):
+        """get_week_schedule (incl. ASCII-weergave en statistieken) vraagt de datum één keer op."""
+        engine = patched_engine
+        engine.get_week_schedule()
+
+        today_spy = MagicMock(side_effect=mock_db.today_local)
+        with patch.object(task_engine, "today_local", today_spy):
+            engine.get_week_schedule()
+
+        assert today_spy.call_count == 1
+
+class TestMonthlyStatsCache:
+    """Test de cache van de maand-completions voor de maandstand."""
+
+    def test_month_completions_fetched_once(self, patched_engine, mock_db):
+        """Zonder meegegeven completions wordt de maand maar één keer opgehaald."""
+        engine = patched_engine
+
+        fetch_spy = MagicMock(side_effect=mock_db.get_completions_for_month)
+        with patch.object(task_engine.db, "get_completions_for_month", fetch_spy):
+            first = engine._get_monthly_task_stats()
+            second = engine._get_monthly_task_stats()
+
+        assert fetch_spy.call_count == 1
+        assert first == second
+
+    def test_month_stats_see_new_completion(self, patched_engine, mock_db):
+        """Een nieuwe completion is direct zichtbaar in de maandstand."""
+        engine = patched_engine
+
+        before = engine._get_monthly_task_stats()
+        engine.complete_task("Nora", "dekken")
+        after = engine._get_monthly_task_stats()
+
+        assert after["dekken"]["Nora"]["done"] == before["dekken"]["Nora"]["done"] + 1
+
+
+class TestScheduleExistsCache:
+    """Test de cache van de rooster-bestaat check bij completions."""
+
+    def test_existing_schedule_checked_once(self, patched_engine, mock_db):
+        """Zolang het rooster bestaat wordt de check niet herhaald."""
+        engine = patched_engine
+        engine.get_week_schedule()
+
+        exists_spy = MagicMock(side_effect=mock_db.schedule_exists_for_week)
+        with patch.object(task_engine.db, "schedule_exists_for_week", exists_spy):
+            engine.complete_task("Nora", "dekken")
+            engine.complete_task("Linde", "inruimen")
+
+        assert exists_spy.call_count == 1
+
+    def test_missing_schedule_not_cached(self, patched_engine, mock_db):
+        """Een week zonder rooster wordt opnieuw gecheckt."""
+        engine = patched_engine
+        week_number = engine.get_current_week()
+        year = mock_db.today_local().isocalendar()[0]
+
+        assert not engine._schedule_exists(week_number, year)
+        engine.get_week_schedule()
+        assert engine._schedule_exists(week_number, year)
@@ -8,9 +8,20 @@ Deze regels zijn afgesproken en moeten altijd gelden:
 4. Max 1 taak per tijdslot per persoon per dag
 5. Max 5 taken per dag totaal (anders te druk)
 """
+import heapq
+from collections import Counter
+from math import comb
+from unittest.mock import patch
+
 import pytest
 from datetime import date, timedelta
 
+from src import task_engine
+from src.models import Task
+from src.task_engine import (
+    DISTRIBUTION_BEAM_WIDTH, MAX_TASKS_PER_DAY, TASK_MIN_SPACING, WEEKDAY_ONLY_TASKS,
+    task_slot_bit,
+)
 from tests.conftest import get_tasks_per_day_per_member
 
 
@@ -172,6 +183,22 @@ class TestTimeslotConstraints:
                     f"{person} heeft {len(tasks_list)} taken in {slot} slot op {day_name}: {tasks_list}"
 
 
+    def test_unknown_timeslots_only_block_themselves(self):
+        """Taken met een onbekend tijdslot blokkeren alleen taken met hetzelfde slot."""
+        def make_task(name, time_of_day):
+            return Task(id=name, name=name, display_name=name, weekly_target=1,
+                        per_child_target=1, rotation_weeks=1, time_of_day=time_of_day)
+
+        nacht = task_slot_bit(make_task("nachtwacht", "nacht"))
+        nacht_again = task_slot_bit(make_task("nachtwacht_2", "nacht"))
+        lunch = task_slot_bit(make_task("lunch", "lunch"))
+        known = [task_slot_bit(make_task(name, slot)) for slot, name in
+                 (("ochtend", "uitruimen_ochtend"), ("middag", "glas"), ("avond", "dekken"))]
+
+        assert nacht == nacht_again
+        assert not nacht & lunch
+        assert not any((nacht | lunch) & bit for bit in known)
+
 class TestMaxTasksPerDay:
     """Test maximum taken per dag limiet."""
 
@@ -363,3 +390,61 @@ class TestConstraintsWithAbsence:
 
             assert len(evening_tasks) <= 1, \
                 f"Nora heeft {len(evening_tasks)} avondtaken op {day}: {evening_tasks}"
+
+
+class TestWeekDistribution:
+    """De verdeling van taken over de week (_distribute_tasks_over_week)."""
+
+    def test_targets_met_and_rules_respected(self, patched_engine, members, tasks):
+        """Alle weekly targets worden gehaald zonder de regels te breken."""
+        engine = patched_engine
+        day_availability = [list(members) for _ in range(7)]
+
+        task_days = engine._distribute_tasks_over_week(tasks, day_availability)
+
+        for task in tasks:
+            days = task_days[task.name]
+            assert len(days) == task.weekly_target, \
+                f"{task.name}: {len(days)} dagen, target {task.weekly_target}"
+            spacing = TASK_MIN_SPACING.get(task.name)
+            if spacing:
+                for earlier, later in zip(days, days[1:]):
+                    assert later - earlier >= spacing, f"{task.name} te dicht op elkaar: {days}"
+            if task.name in WEEKDAY_ONLY_TASKS:
+                assert all(day < 5 for day in days), f"{task.name} in het weekend: {days}"
+
+        loads = Counter(day for days in task_days.values() for day in days)
+        assert max(loads.values()) <= MAX_TASKS_PER_DAY
+
+    def test_many_tasks_bounded_search(self, patched_engine, members):
+        """Ook met veel taken blijft de zoekruimte begrensd en de daglimiet heel."""
+        engine = patched_engine
+        day_availability = [list(members) for _ in range(7)]
+        many_tasks = [
+            Task(id=str(100 + i), name=f"taak_{i}", display_name=f"taak {i}",
+                 weekly_target=2 + i % 3, per_child_target=1, rotation_weeks=1,
+                 time_of_day="avond")
+            for i in range(20)
+        ]
+
+        # Tel per taak hoeveel tussenstanden er voor het snoeien waren
+        explored = []
+        real_nsmallest = heapq.nsmallest
+
+        def counting_nsmallest(n, iterable, key=None):
+            items = list(iterable)
+            explored.append(len(items))
+            return real_nsmallest(n, items, key=key)
+
+        with patch.object(task_engine.heapq, "nsmallest", counting_nsmallest):
+            task_days = engine._distribute_tasks_over_week(many_tasks, day_availability)
+
+        # Per taak hooguit DISTRIBUTION_BEAM_WIDTH standen, elk met hooguit
+        # C(7, target) dag-combinaties
+        max_subsets = max(comb(7, task.weekly_target) for task in many_tasks)
+        assert 0 < len(explored) <= len(many_tasks)
+        assert all(n <= DISTRIBUTION_BEAM_WIDTH * max_subsets for n in explored), explored
+        loads = Counter(day for days in task_days.values() for day in days)
+        assert max(loads.values()) <= MAX_TASKS_PER_DAY
+        # Meer taken dan plekken: de week zit helemaal vol
+        assert sum(loads.values()) == 7 * MAX_TASKS_PER_DAY
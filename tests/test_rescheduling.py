@@ -368,6 +368,40 @@ class TestEdgeCasesRescheduling:
         # Het systeem moet graceful falen als herplanning niet mogelijk is
         assert schedule_data is not None
 
+    def test_reschedule_skips_days_with_same_task(self, patched_engine, members):
+        """Herplanning zet een taak niet op een dag waar die taak al staat."""
+        engine = patched_engine
+        mock_db = engine._mock_db
+
+        # Start op maandag
+        today = mock_db.today_local()
+        mock_db.set_current_date(today - timedelta(days=today.weekday()))
+
+        engine.get_week_schedule()
+        week_number = engine.get_current_week()
+        original = next(a for a in mock_db.schedule_assignments if a.day_of_week == 0)
+        year = original.year
+
+        # Dezelfde taak staat ook al op dinsdag t/m zaterdag
+        taken_days = {a.day_of_week for a in mock_db.schedule_assignments
+                      if a.task_id == original.task_id}
+        for day in range(1, 6):
+            if day not in taken_days:
+                mock_db.add_assignment(week_number, year, day, original.task_id,
+                                       original.task_name, original.member_id,
+                                       original.member_name)
+
+        # Vanaf dinsdag herplannen: alleen zondag is nog vrij voor deze taak
+        engine._reschedule_task(original, week_number, year, current_day=1)
+
+        moved = next((a for a in mock_db.schedule_assignments if a.id == original.id), None)
+        if moved is not None:
+            assert moved.day_of_week not in range(1, 6)
+        same_task = [a.day_of_week for a in mock_db.schedule_assignments
+                     if a.task_id == original.task_id and a.week_number == week_number]
+        assert len(same_task) == len(set(same_task)), \
+            f"Taak {original.task_name} staat dubbel op een dag: {sorted(same_task)}"
+
     def test_complete_task_not_in_schedule(self, patched_engine, members, tasks):
         """Voltooien van taak die niet in rooster staat (extra taak)."""
         engine = patched_engine
@@ -249,6 +249,37 @@ class TestSuggestMemberForTask:
         expected_names = {m.name for m in members}
         assert score_names == expected_names
 
+    def test_single_available_member_is_suggested(self, patched_engine, members, tasks):
+        """Als maar één lid beschikbaar is, wordt die direct gesuggereerd."""
+        engine = patched_engine
+        mock_db = engine._mock_db
+        task = tasks[0]
+        today = mock_db.today_local()
+
+        for m in members[1:]:
+            mock_db.add_absence({
+                "member_id": m.id,
+                "member_name": m.name,
+                "start_date": today,
+                "end_date": today,
+                "reason": "test"
+            })
+        earlier = mock_db.add_completion({
+            "task_id": task.id,
+            "member_id": members[0].id,
+            "member_name": members[0].name,
+            "task_name": task.display_name,
+            "week_number": (today - timedelta(days=10)).isocalendar()[1],
+            "completed_date": today - timedelta(days=10)
+        })
+
+        suggestion = engine.suggest_member_for_task(task.display_name)
+
+        assert suggestion.suggested_member.name == members[0].name
+        assert len(suggestion.scores) == 1
+        assert suggestion.scores[0].last_did_task == earlier.completed_at
+        assert "enige" in suggestion.reason
+
     def test_unknown_task_raises_error(self, patched_engine):
         """Onbekende taak moet ValueError geven."""
         engine = patched_engine